@@ -3,19 +3,22 @@ from __future__ import annotations
 from collections.abc import Hashable, Iterable, Mapping
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Optional, Union
 
 import dimod
-from rich.console import Console
-from rich.table import Table
+import numpy as np
 
 from qsol.util.example_equivalence import (
     EquivalenceExampleSpec,
     RuntimeSolveOptions,
+    chosen_subset_elements,
     run_bqm_equivalence_example,
     sample_best_assignment,
 )
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
 Var = Hashable
 Linear = Mapping[Var, float]
 Quadratic = Mapping[tuple[Var, Var], float]
@@ -46,36 +49,48 @@ def build_bqm(
     Notes:
         - Duplicate quadratic keys are summed.
         - Self-loops (u == v) are treated as linear in dimod; we route them to linear.
+        - Zero-bias quadratic terms add no interaction, but their endpoints are still
+          added as variables.
     """
     vt = dimod.as_vartype(vartype)
 
     bqm = dimod.BinaryQuadraticModel({}, {}, offset, vt)
 
     if linear:
-        for v, b in linear.items():
-            bqm.add_variable(v, float(b))
+        bqm.add_linear_from((v, float(b)) for v, b in linear.items())
 
     if quadratic:
-        for (u, v), b in quadratic.items():
-            if u == v:
-                bqm.add_variable(u, float(b))
-            else:
-                bqm.add_interaction(u, v, float(b))
+        _add_quadratic_terms(bqm, ((u, v, b) for (u, v), b in quadratic.items()))
 
     if add_linear:
-        for v, b in add_linear:
-            bqm.add_variable(v, float(b))
+        bqm.add_linear_from((v, float(b)) for v, b in add_linear)
 
     if add_interactions:
-        for u, v, b in add_interactions:
-            if u == v:
-                bqm.add_variable(u, float(b))
-            else:
-                bqm.add_interaction(u, v, float(b))
+        _add_quadratic_terms(bqm, add_interactions)
 
     return bqm
 
 
+def _add_quadratic_terms(
+    bqm: dimod.BinaryQuadraticModel, terms: Iterable[tuple[Var, Var, float]]
+) -> None:
+    triplets = [(u, v, float(b)) for u, v, b in terms]
+    # Register every endpoint in term order (self-loops carry their bias) so a
+    # variable seen only in zero-bias interactions still belongs to the model.
+    bqm.add_linear_from(
+        pair for u, v, b in triplets for pair in (((u, b),) if u == v else ((u, 0.0), (v, 0.0)))
+    )
+    bqm.add_quadratic_from((u, v, b) for u, v, b in triplets if u != v and b)
+
+
+_NUMERIC_TYPES = frozenset({int, float})
+
+
+def _all_numeric(values: list[object]) -> bool:
+    # Exact type match keeps `bool` (an `int` subclass) out without a per-cell isinstance.
+    return set(map(type, values)) <= _NUMERIC_TYPES
+
+
 def build_generic_bqm_from_instance(
     instance: Mapping[str, object],
     *,
@@ -106,41 +121,68 @@ def build_generic_bqm_from_instance(
     if isinstance(raw_offset, bool) or not isinstance(raw_offset, (int, float)):
         raise ValueError(f"instance `params.{offset_param}` must be numeric")
 
-    variables = [str(v) for v in raw_vars]
-    linear_biases: dict[str, float] = {}
-    quadratic_biases: dict[tuple[str, str], float] = {}
-    labels = {v: f"{unknown_name}.has[{v}]" for v in variables}
-
-    for v in variables:
-        raw_value = raw_linear.get(v, 0.0)
-        if isinstance(raw_value, bool) or not isinstance(raw_value, (int, float)):
-            raise ValueError(f"instance `params.{linear_param}[{v}]` must be numeric")
-        linear_biases[labels[v]] = float(raw_value)
+    # Duplicate set elements collapse onto a single variable.
+    variables = list(dict.fromkeys(str(v) for v in raw_vars))
+    index = {v: idx for idx, v in enumerate(variables)}
+    labels = [f"{unknown_name}.has[{v}]" for v in variables]
 
+    raw_linear_values = [raw_linear.get(v, 0.0) for v in variables]
+    if not _all_numeric(raw_linear_values):
+        for v, raw_value in zip(variables, raw_linear_values, strict=True):
+            if isinstance(raw_value, bool) or not isinstance(raw_value, (int, float)):
+                raise ValueError(f"instance `params.{linear_param}[{v}]` must be numeric")
+    linear = np.asarray(raw_linear_values, dtype=np.float64).reshape(len(variables))
+
+    # Only the cells actually supplied in the instance are visited, so sparse
+    # matrices cost O(nnz) rather than O(N^2).
+    row_chunks: list[np.ndarray] = [np.empty(0, dtype=np.intp)]
+    col_chunks: list[np.ndarray] = [np.empty(0, dtype=np.intp)]
+    bias_chunks: list[np.ndarray] = [np.empty(0, dtype=np.float64)]
     for i in variables:
         row = raw_quadratic.get(i, {})
         if not isinstance(row, dict):
             raise ValueError(f"instance `params.{quadratic_param}[{i}]` must be an object")
-        for j in variables:
-            raw_value = row.get(j, 0.0)
-            if isinstance(raw_value, bool) or not isinstance(raw_value, (int, float)):
-                raise ValueError(f"instance `params.{quadratic_param}[{i}][{j}]` must be numeric")
-            value = float(raw_value)
-            if value != 0.0:
-                quadratic_biases[(labels[i], labels[j])] = value
-
-    return build_bqm(
-        linear=linear_biases,
-        quadratic=quadratic_biases,
-        offset=float(raw_offset),
-        vartype=dimod.BINARY,
+        cells = [j for j in row if j in index]
+        raw_row_values = [row[j] for j in cells]
+        if not _all_numeric(raw_row_values):
+            for j, raw_value in zip(cells, raw_row_values, strict=True):
+                if isinstance(raw_value, bool) or not isinstance(raw_value, (int, float)):
+                    raise ValueError(
+                        f"instance `params.{quadratic_param}[{i}][{j}]` must be numeric"
+                    )
+
+        row_idx = index[i]
+        col_idx = np.fromiter((index[j] for j in cells), dtype=np.intp, count=len(cells))
+        values = np.asarray(raw_row_values, dtype=np.float64).reshape(len(cells))
+
+        # Self-loops are linear for BINARY variables.
+        diagonal = col_idx == row_idx
+        linear[row_idx] += values[diagonal].sum()
+
+        # (i, j) and (j, i) are summed onto the upper triangle by dimod.
+        off_diagonal = ~diagonal & (values != 0.0)
+        col_idx = col_idx[off_diagonal]
+        row_chunks.append(np.minimum(col_idx, row_idx))
+        col_chunks.append(np.maximum(col_idx, row_idx))
+        bias_chunks.append(values[off_diagonal])
+
+    return dimod.BinaryQuadraticModel.from_numpy_vectors(
+        linear,
+        (
+            np.concatenate(row_chunks, dtype=np.intp),
+            np.concatenate(col_chunks, dtype=np.intp),
+            np.concatenate(bias_chunks, dtype=np.float64),
+        ),
+        float(raw_offset),
+        dimod.BINARY,
+        variable_order=labels,
     )
 
 
 @dataclass(slots=True)
 class GenericBQMSolveResult:
     energy: float
-    chosen_variables: list[str]
+    chosen_variables: tuple[str, ...]
 
 
 def _solve_bqm(
@@ -152,21 +194,16 @@ def _solve_bqm(
 ) -> GenericBQMSolveResult:
     best = sample_best_assignment(bqm, options)
     prefix = f"{unknown_name}.has["
-    chosen_labels = [
-        str(name)
-        for name, value in best.sample.items()
-        if int(value) == 1 and str(name).startswith(prefix)
-    ]
-    chosen_variables = sorted(
-        label.removeprefix(prefix).removesuffix("]") for label in chosen_labels
-    )
+    chosen_variables = chosen_subset_elements(best.sample, prefix)
     return GenericBQMSolveResult(
         energy=float(best.energy),
-        chosen_variables=chosen_variables,
+        chosen_variables=tuple(chosen_variables),
     )
 
 
 def _render_solution(console: Console, result: GenericBQMSolveResult, title: str) -> None:
+    from rich.table import Table
+
     table = Table(title=title)
     table.add_column("Field")
     table.add_column("Value")
@@ -2,46 +2,91 @@ from __future__ import annotations
 
 from collections.abc import Hashable, Mapping
 from dataclasses import dataclass
-from itertools import combinations
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import dimod
-from rich.console import Console
-from rich.table import Table
+import numpy as np
 
 from qsol.util.example_equivalence import (
     EquivalenceExampleSpec,
     RuntimeSolveOptions,
+    chosen_subset_elements,
     run_bqm_equivalence_example,
     sample_best_assignment,
 )
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@lru_cache(maxsize=16)
+def _triu_pairs(n: int) -> tuple[np.ndarray, np.ndarray]:
+    rows, cols = np.triu_indices(n, k=1)
+    # Shared across calls, so guard against accidental in-place edits.
+    rows.flags.writeable = False
+    cols.flags.writeable = False
+    return rows, cols
+
 
 def graph_partition_bqm(
     V: list[Hashable],
     E: list[tuple[Hashable, Hashable]],
     A: float = 1.0,
     B: float = 1.0,
+    *,
+    vartype: dimod.Vartype | str = dimod.SPIN,
 ) -> dimod.BinaryQuadraticModel:
     """
-    Build the SPIN BQM:
+    Build the BQM:
 
         H = A (sum_i s_i)^2  +  B * sum_(u,v in E) (1 - s_u s_v)/2
 
-    with s_i in {-1, +1}.
+    with s_i in {-1, +1}. For ``vartype=BINARY`` the substitution
+    s_i = 2 x_i - 1 is applied analytically to the coefficient vectors.
     """
-    bqm = dimod.BinaryQuadraticModel({}, {}, 0.0, vartype=dimod.SPIN)
-
+    vartype = dimod.as_vartype(vartype)
     n = len(V)
-    bqm.offset += A * n
-    for u, v in combinations(V, 2):
-        bqm.add_quadratic(u, v, 2.0 * A)
-
-    bqm.offset += (B / 2.0) * len(E)
-    for u, v in E:
-        bqm.add_quadratic(u, v, -B / 2.0)
-
-    return bqm
+    index = {v: idx for idx, v in enumerate(V)}
+
+    # Balance term: every unordered pair of vertices gets 2A.
+    pair_rows, pair_cols = _triu_pairs(n)
+    pair_biases = np.full(pair_rows.size, 2.0 * A)
+
+    for edge in E:
+        for endpoint in edge:
+            if endpoint not in index:
+                raise ValueError(
+                    f"graph_partition_bqm edge endpoint `{endpoint}` is not a vertex in V"
+                )
+
+    # Cut term: each edge contributes -B/2, folded straight onto its pair's slot
+    # in the row-major upper triangle so the BQM is built from unique pairs.
+    edge_u = np.fromiter((index[u] for u, _ in E), dtype=np.intp, count=len(E))
+    edge_v = np.fromiter((index[v] for _, v in E), dtype=np.intp, count=len(E))
+    if np.any(edge_u == edge_v):
+        raise ValueError("graph_partition_bqm does not support self-loop edges")
+    lo = np.minimum(edge_u, edge_v)
+    hi = np.maximum(edge_u, edge_v)
+    np.add.at(pair_biases, lo * n - lo * (lo + 1) // 2 + (hi - lo - 1), -B / 2.0)
+
+    linear = np.zeros(n)
+    offset = A * n + (B / 2.0) * len(E)
+    if vartype == dimod.BINARY:
+        # J s_i s_j = 4J x_i x_j - 2J x_i - 2J x_j + J
+        linear -= 2.0 * np.bincount(pair_rows, weights=pair_biases, minlength=n)
+        linear -= 2.0 * np.bincount(pair_cols, weights=pair_biases, minlength=n)
+        offset += float(pair_biases.sum())
+        pair_biases *= 4.0
+
+    return dimod.BinaryQuadraticModel.from_numpy_vectors(
+        linear,
+        (pair_rows, pair_cols, pair_biases),
+        offset,
+        vartype,
+        variable_order=V,
+    )
 
 
 def build_min_bisection_bqm(
@@ -107,14 +152,14 @@ def build_min_bisection_bqm(
     penalty_a = _read_numeric_param(params_payload, penalty_param, default=1.0)
     edge_weight_b = _read_numeric_param(params_payload, edge_weight_param, default=1.0)
 
-    spin_bqm = graph_partition_bqm(
+    # QSOL backend emits BINARY BQMs; build directly in that vartype.
+    return graph_partition_bqm(
         [vertex_labels[v] for v in vertices],
         lifted_edges,
         A=penalty_a,
         B=edge_weight_b,
+        vartype=dimod.BINARY,
     )
-    # QSOL backend emits BINARY BQMs; compare in that vartype.
-    return spin_bqm.change_vartype(dimod.BINARY, inplace=False)
 
 
 def _read_numeric_param(params: Mapping[str, object], key: str, *, default: float) -> float:
@@ -129,9 +174,9 @@ def _read_numeric_param(params: Mapping[str, object], key: str, *, default: floa
 @dataclass(slots=True)
 class MinBisectionSolveResult:
     energy: float
-    chosen_vertices: list[str]
-    other_vertices: list[str]
-    cut_edges: list[str]
+    chosen_vertices: tuple[str, ...]
+    other_vertices: tuple[str, ...]
+    cut_edges: tuple[str, ...]
     cut_size: int
 
 
@@ -146,22 +191,16 @@ def _solve_min_bisection_bqm(
 
     active_unknown_name = unknown_name
     default_prefix = f"{unknown_name}.has["
-    if not any(str(name).startswith(default_prefix) for name in best.sample):
+    sample_labels = [str(name) for name in best.sample]
+    if not any(label.startswith(default_prefix) for label in sample_labels):
         inferred = sorted(
-            {label.split(".has[", 1)[0] for label in map(str, best.sample) if ".has[" in label}
+            {label.split(".has[", 1)[0] for label in sample_labels if ".has[" in label}
         )
         if inferred:
             active_unknown_name = inferred[0]
 
     prefix = f"{active_unknown_name}.has["
-    chosen_labels = [
-        str(name)
-        for name, value in best.sample.items()
-        if int(value) == 1 and str(name).startswith(prefix)
-    ]
-    chosen_vertices = sorted(
-        label.removeprefix(prefix).removesuffix("]") for label in chosen_labels
-    )
+    chosen_vertices = chosen_subset_elements(best.sample, prefix)
 
     sets_payload = instance.get("sets")
     params_payload = instance.get("params")
@@ -170,7 +209,8 @@ def _solve_min_bisection_bqm(
         if isinstance(sets_payload, dict) and isinstance(sets_payload.get("V"), list)
         else []
     )
-    other_vertices = sorted(v for v in all_vertices if v not in chosen_vertices)
+    side_a = set(chosen_vertices)
+    other_vertices = sorted(v for v in all_vertices if v not in side_a)
 
     edge_ids = (
         [str(e) for e in sets_payload.get("E", [])]
@@ -180,26 +220,26 @@ def _solve_min_bisection_bqm(
     u_map = params_payload.get("U", {}) if isinstance(params_payload, dict) else {}
     w_map = params_payload.get("W", {}) if isinstance(params_payload, dict) else {}
     cut_edges: list[str] = []
-    side_a = set(chosen_vertices)
     if isinstance(u_map, dict) and isinstance(w_map, dict):
-        for edge_id in edge_ids:
-            if edge_id not in u_map or edge_id not in w_map:
-                continue
-            u = str(u_map[edge_id])
-            v = str(w_map[edge_id])
-            if (u in side_a) != (v in side_a):
-                cut_edges.append(edge_id)
+        known_edges = [e for e in edge_ids if e in u_map and e in w_map]
+        count = len(known_edges)
+        u_in_a = np.fromiter((str(u_map[e]) in side_a for e in known_edges), bool, count)
+        w_in_a = np.fromiter((str(w_map[e]) in side_a for e in known_edges), bool, count)
+        cut_mask = u_in_a ^ w_in_a
+        cut_edges = np.asarray(known_edges, dtype=object)[cut_mask].tolist()
 
     return MinBisectionSolveResult(
         energy=float(best.energy),
-        chosen_vertices=chosen_vertices,
-        other_vertices=other_vertices,
-        cut_edges=sorted(cut_edges),
+        chosen_vertices=tuple(chosen_vertices),
+        other_vertices=tuple(other_vertices),
+        cut_edges=tuple(sorted(cut_edges)),
         cut_size=len(cut_edges),
     )
 
 
 def _render_solution(console: Console, result: MinBisectionSolveResult, title: str) -> None:
+    from rich.table import Table
+
     table = Table(title=title)
     table.add_column("Field")
     table.add_column("Value")
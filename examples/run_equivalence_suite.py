@@ -3,13 +3,17 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import signal
 import subprocess
 import sys
-from dataclasses import dataclass
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from time import perf_counter
 
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.table import Table
 
@@ -31,31 +35,33 @@ class SuiteResult:
     offset_expected: float | None = None
     offset_actual: float | None = None
     offset_delta: float | None = None
+    omitted_lines: int = 0
 
-    @property
-    def passed(self) -> bool:
-        return self.returncode == 0 and not self.timed_out
+    # Derived once in __post_init__; the rendering loop reads them as plain slots.
+    passed: bool = field(init=False)
+    status: str = field(init=False)
+    structural_status: str = field(init=False)
+    result_status: str = field(init=False)
 
-    @property
-    def status(self) -> str:
+    def __post_init__(self) -> None:
+        self.passed = self.returncode == 0 and not self.timed_out
         if self.timed_out:
-            return "timeout"
-        return "pass" if self.passed else "fail"
+            self.status = "timeout"
+        else:
+            self.status = "pass" if self.passed else "fail"
+        self.structural_status = _equivalence_status(self.structural_equivalent, "unknown")
+        self.result_status = _equivalence_status(self.result_equivalent, "skipped")
 
-    @property
-    def structural_status(self) -> str:
-        if self.structural_equivalent is None:
-            return "unknown"
-        return "equivalent" if self.structural_equivalent else "not-equivalent"
 
-    @property
-    def result_status(self) -> str:
-        if self.result_equivalent is None:
-            return "skipped"
-        return "equivalent" if self.result_equivalent else "not-equivalent"
+def _equivalence_status(equivalent: bool | None, missing: str) -> str:
+    if equivalent is None:
+        return missing
+    return "equivalent" if equivalent else "not-equivalent"
 
 
 SUMMARY_MARKER = "__QSOL_EQUIV_SUMMARY__"
+TAIL_LINES = 60
+EQUIVALENCE_STYLES: dict[bool | None, str] = {True: "green", False: "red", None: "yellow"}
 
 
 def _parse_args() -> argparse.Namespace:
@@ -89,6 +95,12 @@ def _parse_args() -> argparse.Namespace:
         default=0,
         help="Per-script timeout in seconds; 0 disables timeout (default: 0).",
     )
+    parser.add_argument(
+        "--jobs",
+        type=_job_count,
+        default=None,
+        help="Number of scripts to run concurrently (default: the CPU count).",
+    )
     return parser.parse_args()
 
 
@@ -102,11 +114,26 @@ def _positive_int(value: str) -> int:
     return parsed
 
 
+def _job_count(value: str) -> int:
+    parsed = _positive_int(value)
+    if parsed == 0:
+        raise argparse.ArgumentTypeError("must be >= 1")
+    return parsed
+
+
 def _discover_equivalence_scripts(examples_dir: Path) -> list[Path]:
-    canonical = examples_dir.glob("*/test_equivalence.py")
-    legacy = examples_dir.glob("*/test_quivalence.py")
-    discovered = sorted({path.resolve() for path in [*canonical, *legacy] if path.is_file()})
-    return discovered
+    # One readdir pass; DirEntry caches its type, so only the candidates are stat'ed.
+    found: list[Path] = []
+    with os.scandir(examples_dir) as entries:
+        for entry in entries:
+            # Match glob("*") semantics: hidden directories are not examples.
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            for name in ("test_equivalence.py", "test_quivalence.py"):
+                candidate = Path(entry.path, name)
+                if candidate.is_file():
+                    found.append(candidate)
+    return sorted({path.resolve() for path in found})
 
 
 def _build_command(script: Path, *, sampler: str, num_reads: int) -> list[str]:
@@ -116,6 +143,35 @@ def _build_command(script: Path, *, sampler: str, num_reads: int) -> list[str]:
     return cmd
 
 
+class _LiveProcesses:
+    # Children run in their own sessions and never see the terminal's SIGINT, so
+    # track the running ones for main() to stop on an interrupt.
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._procs: set[subprocess.Popen[str]] = set()
+        self._closed = False
+
+    def add(self, proc: subprocess.Popen[str]) -> bool:
+        with self._lock:
+            if self._closed:
+                return False
+            self._procs.add(proc)
+            return True
+
+    def discard(self, proc: subprocess.Popen[str]) -> None:
+        with self._lock:
+            self._procs.discard(proc)
+
+    def kill_all(self) -> None:
+        # Close first so a worker that is just starting a child kills it itself.
+        with self._lock:
+            self._closed = True
+            procs = list(self._procs)
+        for proc in procs:
+            _kill_process_group(proc)
+
+
 def _run_script(
     script: Path,
     *,
@@ -123,85 +179,117 @@ def _run_script(
     sampler: str,
     num_reads: int,
     timeout_seconds: int,
+    run_env: dict[str, str],
+    live: _LiveProcesses,
 ) -> SuiteResult:
     cmd = _build_command(script, sampler=sampler, num_reads=num_reads)
     example = script.parent.name
     start = perf_counter()
-    run_env = {**os.environ, "QSOL_EQUIV_SUMMARY_JSON": "1"}
+    # Only the tail is ever displayed, so keep just that many lines while streaming.
+    tail: deque[str] = deque(maxlen=TAIL_LINES)
+    total_lines = 0
+    summary: dict[str, object] = {}
+    expired = threading.Event()
+    # Serialises the timer with the main thread's exit handling, so an exit racing
+    # the deadline is never flagged as a timeout or killed after being reaped.
+    reap_lock = threading.Lock()
+    finished = False
+    with subprocess.Popen(
+        cmd,
+        cwd=repo_root,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        env=run_env,
+        # Python creates fds non-inheritable, so skip the child-side fd sweep.
+        close_fds=False,
+        # Own process group, so a timeout also reaches any workers the script spawned.
+        start_new_session=True,
+    ) as proc:
+        if not live.add(proc):
+            _kill_process_group(proc)
+
+        def _expire() -> None:
+            with reap_lock:
+                if finished or proc.poll() is not None:
+                    return
+                expired.set()
+                _kill_process_group(proc)
+
+        timer = threading.Timer(timeout_seconds, _expire) if timeout_seconds > 0 else None
+        if timer is not None:
+            timer.start()
+        try:
+            assert proc.stdout is not None
+            for raw_line in proc.stdout:
+                line = raw_line.rstrip("\n")
+                if line.startswith(SUMMARY_MARKER):
+                    parsed = _parse_summary(line.removeprefix(SUMMARY_MARKER))
+                    if parsed is not None:
+                        summary = parsed
+                    continue
+                tail.append(line)
+                total_lines += 1
+            # Output is done; take over the deadline from the timer before reaping.
+            with reap_lock:
+                finished = True
+                if timer is not None:
+                    timer.cancel()
+            remaining = (
+                max(0.0, timeout_seconds - (perf_counter() - start))
+                if timeout_seconds > 0 and not expired.is_set()
+                else None
+            )
+            try:
+                returncode = proc.wait(timeout=remaining)
+            except subprocess.TimeoutExpired:
+                expired.set()
+                _kill_process_group(proc)
+                returncode = proc.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            live.discard(proc)
+
+    duration = perf_counter() - start
+    timed_out = expired.is_set()
+    return SuiteResult(
+        script=script,
+        example=example,
+        returncode=124 if timed_out else returncode,
+        duration_seconds=duration,
+        output="\n".join(tail).strip(),
+        timed_out=timed_out,
+        structural_equivalent=summary.get("structural_equivalent"),
+        result_equivalent=summary.get("result_equivalent"),
+        expected_num_variables=summary.get("expected_num_variables"),
+        actual_num_variables=summary.get("actual_num_variables"),
+        expected_num_interactions=summary.get("expected_num_interactions"),
+        actual_num_interactions=summary.get("actual_num_interactions"),
+        offset_expected=summary.get("offset_expected"),
+        offset_actual=summary.get("offset_actual"),
+        offset_delta=summary.get("offset_delta"),
+        omitted_lines=total_lines - len(tail),
+    )
+
+
+def _kill_process_group(proc: subprocess.Popen[str]) -> None:
+    if not hasattr(os, "killpg"):
+        proc.kill()
+        return
     try:
-        completed = subprocess.run(
-            cmd,
-            cwd=repo_root,
-            check=False,
-            capture_output=True,
-            text=True,
-            env=run_env,
-            timeout=timeout_seconds if timeout_seconds > 0 else None,
-        )
-        duration = perf_counter() - start
-        output = completed.stdout
-        if completed.stderr:
-            output = f"{output}\n{completed.stderr}" if output else completed.stderr
-        clean_output, summary = _extract_summary(output)
-        return SuiteResult(
-            script=script,
-            example=example,
-            returncode=completed.returncode,
-            duration_seconds=duration,
-            output=clean_output,
-            structural_equivalent=summary.get("structural_equivalent"),
-            result_equivalent=summary.get("result_equivalent"),
-            expected_num_variables=summary.get("expected_num_variables"),
-            actual_num_variables=summary.get("actual_num_variables"),
-            expected_num_interactions=summary.get("expected_num_interactions"),
-            actual_num_interactions=summary.get("actual_num_interactions"),
-            offset_expected=summary.get("offset_expected"),
-            offset_actual=summary.get("offset_actual"),
-            offset_delta=summary.get("offset_delta"),
-        )
-    except subprocess.TimeoutExpired as exc:
-        duration = perf_counter() - start
-        stdout = exc.stdout or ""
-        stderr = exc.stderr or ""
-        output = stdout
-        if stderr:
-            output = f"{output}\n{stderr}" if output else stderr
-        clean_output, summary = _extract_summary(output)
-        return SuiteResult(
-            script=script,
-            example=example,
-            returncode=124,
-            duration_seconds=duration,
-            output=clean_output,
-            timed_out=True,
-            structural_equivalent=summary.get("structural_equivalent"),
-            result_equivalent=summary.get("result_equivalent"),
-            expected_num_variables=summary.get("expected_num_variables"),
-            actual_num_variables=summary.get("actual_num_variables"),
-            expected_num_interactions=summary.get("expected_num_interactions"),
-            actual_num_interactions=summary.get("actual_num_interactions"),
-            offset_expected=summary.get("offset_expected"),
-            offset_actual=summary.get("offset_actual"),
-            offset_delta=summary.get("offset_delta"),
-        )
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
 
 
-def _extract_summary(output: str) -> tuple[str, dict[str, object]]:
-    summary: dict[str, object] = {}
-    kept_lines: list[str] = []
-    for line in output.splitlines():
-        if not line.startswith(SUMMARY_MARKER):
-            kept_lines.append(line)
-            continue
-        payload = line.removeprefix(SUMMARY_MARKER)
-        try:
-            parsed = json.loads(payload)
-        except json.JSONDecodeError:
-            continue
-        if isinstance(parsed, dict):
-            summary = parsed
-    clean_output = "\n".join(kept_lines).strip()
-    return clean_output, summary
+def _parse_summary(payload: str) -> dict[str, object] | None:
+    try:
+        parsed = json.loads(payload)
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
 
 
 def _should_show_output(show_output: str, result: SuiteResult) -> bool:
@@ -212,17 +300,25 @@ def _should_show_output(show_output: str, result: SuiteResult) -> bool:
     return False
 
 
-def _tail_output(text: str, *, max_lines: int = 60) -> str:
+def _tail_output(text: str, *, omitted_lines: int = 0, max_lines: int = TAIL_LINES) -> str:
     if not text.strip():
         return "<no output>"
-    lines = text.rstrip().splitlines()
-    if len(lines) <= max_lines:
+    text = text.rstrip()
+    if not omitted_lines and text.count("\n") < max_lines:
+        return text
+    lines = text.splitlines()
+    if len(lines) <= max_lines and not omitted_lines:
         return "\n".join(lines)
     tail = "\n".join(lines[-max_lines:])
-    omitted = len(lines) - max_lines
+    omitted = omitted_lines + max(len(lines) - max_lines, 0)
     return f"... ({omitted} lines omitted)\n{tail}"
 
 
+def _styled(text: str, equivalent: bool | None) -> str:
+    style = EQUIVALENCE_STYLES[equivalent]
+    return f"[{style}]{text}[/{style}]"
+
+
 def main() -> int:
     args = _parse_args()
     console = Console()
@@ -235,17 +331,34 @@ def main() -> int:
         console.print("[bold yellow]No equivalence scripts found.[/bold yellow]")
         return 1
 
-    results: list[SuiteResult] = []
-    for script in scripts:
-        results.append(
-            _run_script(
-                script,
-                repo_root=repo_root,
-                sampler=args.sampler,
-                num_reads=args.num_reads,
-                timeout_seconds=args.timeout_seconds,
+    # Each script runs in its own subprocess, so threads are enough to overlap them.
+    # `map` yields results in discovery order regardless of completion order.
+    # Shared by every child; built once rather than per script.
+    run_env = os.environ | {"QSOL_EQUIV_SUMMARY_JSON": "1"}
+    max_workers = min(args.jobs or os.cpu_count() or 1, len(scripts))
+    live = _LiveProcesses()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            results = list(
+                executor.map(
+                    lambda script: _run_script(
+                        script,
+                        repo_root=repo_root,
+                        sampler=args.sampler,
+                        num_reads=args.num_reads,
+                        timeout_seconds=args.timeout_seconds,
+                        run_env=run_env,
+                        live=live,
+                    ),
+                    scripts,
+                )
             )
-        )
+        except BaseException:
+            # Ctrl-C or a failing worker: drop queued scripts and kill the running
+            # ones so the executor's exit does not wait on children that keep going.
+            executor.shutdown(wait=False, cancel_futures=True)
+            live.kill_all()
+            raise
 
     table = Table(title="Example Equivalence Suite")
     table.add_column("Example")
@@ -260,20 +373,6 @@ def main() -> int:
     table.add_column("Time (s)")
 
     for result in results:
-        structural_style = (
-            "green"
-            if result.structural_equivalent is True
-            else "red"
-            if result.structural_equivalent is False
-            else "yellow"
-        )
-        result_style = (
-            "green"
-            if result.result_equivalent is True
-            else "red"
-            if result.result_equivalent is False
-            else "yellow"
-        )
         variables = (
             f"{result.expected_num_variables}/{result.actual_num_variables}"
             if result.expected_num_variables is not None and result.actual_num_variables is not None
@@ -294,8 +393,8 @@ def main() -> int:
         table.add_row(
             result.example,
             args.sampler,
-            f"[{structural_style}]{result.structural_status}[/{structural_style}]",
-            f"[{result_style}]{result.result_status}[/{result_style}]",
+            _styled(result.structural_status, result.structural_equivalent),
+            _styled(result.result_status, result.result_equivalent),
             variables,
             interactions,
             offset,
@@ -304,29 +403,43 @@ def main() -> int:
             f"{result.duration_seconds:.2f}",
         )
 
-    console.print(table)
-
-    passed = sum(1 for r in results if r.passed)
-    failed = sum(1 for r in results if not r.passed and not r.timed_out)
-    timed_out = sum(1 for r in results if r.timed_out)
-    structural_equivalent = sum(1 for r in results if r.structural_equivalent is True)
-    structural_not_equivalent = sum(1 for r in results if r.structural_equivalent is False)
-    result_equivalent = sum(1 for r in results if r.result_equivalent is True)
-    result_not_equivalent = sum(1 for r in results if r.result_equivalent is False)
-    result_skipped = sum(1 for r in results if r.result_equivalent is None)
+    # Tally every bucket in one pass over the results.
+    counts: Counter[object] = Counter()
+    for r in results:
+        counts[r.status] += 1
+        counts["structural", r.structural_equivalent] += 1
+        counts["result", r.result_equivalent] += 1
+    passed = counts["pass"]
+    failed = counts["fail"]
+    timed_out = counts["timeout"]
+    structural_equivalent = counts["structural", True]
+    structural_not_equivalent = counts["structural", False]
+    result_equivalent = counts["result", True]
+    result_not_equivalent = counts["result", False]
+    result_skipped = counts["result", None]
     summary = (
         f"Total: {len(results)} | Passed: {passed} | Failed: {failed} | Timed out: {timed_out}"
         f"\nStructural Eq: {structural_equivalent} | Structural Not-Eq: {structural_not_equivalent}"
         f"\nResult Eq: {result_equivalent} | Result Not-Eq: {result_not_equivalent} | Result Skipped: {result_skipped}"
     )
     summary_style = "green" if failed == 0 and timed_out == 0 else "red"
-    console.print(Panel(summary, title="Summary", border_style=summary_style))
-
-    for result in results:
-        if not _should_show_output(args.show_output, result):
-            continue
-        header = f"{result.example} ({result.status}, exit={result.returncode})"
-        console.print(Panel(_tail_output(result.output), title=header, border_style="blue"))
+    output_panels = [
+        Panel(
+            _tail_output(result.output, omitted_lines=result.omitted_lines),
+            title=f"{result.example} ({result.status}, exit={result.returncode})",
+            border_style="blue",
+        )
+        for result in results
+        if _should_show_output(args.show_output, result)
+    ]
+    # One render pass for the table, summary and any output panels.
+    console.print(
+        Group(
+            table,
+            Panel(summary, title="Summary", border_style=summary_style),
+            *output_panels,
+        )
+    )
 
     return 0 if failed == 0 and timed_out == 0 else 1
 
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import operator
 from collections.abc import Mapping
 from dataclasses import dataclass, field
-from itertools import product
+from itertools import chain, product
 from typing import Any, Callable, cast
 
 import dimod
@@ -23,9 +24,28 @@ from qsol.diag.source import Span
 from qsol.lower import ir
 
 BinaryVar = Any
+ScalarTerm = Callable[[Mapping[str, object], list[Diagnostic]], float | None]
 CMP_EPS = 1e-6
 BOOL_EPS = 1e-9
 INTEGRAL_TOL = 1e-9
+COMPARE_OPS = frozenset({"=", "<=", "<", ">=", ">"})
+SOFT_WEIGHTS = {"should": 10.0, "nice": 1.0}
+# Hoisted so hot isinstance checks do not rebuild the tuple from two globals.
+NUMBER_TYPES = (int, float)
+MODEL_TYPES = (BinaryQuadraticModel, QuadraticModel)
+SCALAR_OPS: dict[type[ir.KExpr], Callable[[float, float], float]] = {
+    ir.KAdd: operator.add,
+    ir.KSub: operator.sub,
+    ir.KMul: operator.mul,
+}
+# op -> (CQM sense, rhs when the difference is integral, rhs otherwise)
+CONSTRAINT_SENSES: dict[str, tuple[str, float, float]] = {
+    "=": ("==", 0.0, 0.0),
+    "<=": ("<=", 0.0, 0.0),
+    "<": ("<=", -1.0, -CMP_EPS),
+    ">=": (">=", 0.0, 0.0),
+    ">": (">=", 1.0, CMP_EPS),
+}
 
 
 def _new_cqm() -> dimod.ConstrainedQuadraticModel:
@@ -43,6 +63,15 @@ def _new_integer(label: str, *, lower_bound: int, upper_bound: int) -> Any:
     return ctor(label, lower_bound=lower_bound, upper_bound=upper_bound)
 
 
+def _quicksum(terms: list[Any]) -> Any:
+    # dimod.quicksum copies the first term and adds the rest in place; plain
+    # sum() builds a new model per term. An empty sum stays the scalar 0.0.
+    if not terms:
+        return 0.0
+    summer = cast(Callable[[list[Any]], Any], dimod.quicksum)
+    return summer(terms)
+
+
 def _convert_cqm_to_bqm(
     cqm: dimod.ConstrainedQuadraticModel,
 ) -> tuple[dimod.BinaryQuadraticModel, Any]:
@@ -53,6 +82,17 @@ def _convert_cqm_to_bqm(
     return converter(cqm)
 
 
+def _unique_diagnostics(diagnostics: list[Diagnostic]) -> list[Diagnostic]:
+    seen: set[tuple[str, str, Span]] = set()
+    unique: list[Diagnostic] = []
+    for diagnostic in diagnostics:
+        key = (diagnostic.code, diagnostic.message, diagnostic.span)
+        if key not in seen:
+            seen.add(key)
+            unique.append(diagnostic)
+    return unique
+
+
 @dataclass(slots=True)
 class CodegenResult:
     cqm: dimod.ConstrainedQuadraticModel
@@ -63,6 +103,72 @@ class CodegenResult:
 
 
 class DimodCodegen:
+    def __init__(self) -> None:
+        self._label_counter = 0
+        self._sorted_sets: dict[int, tuple[list[object], tuple[object, ...]]] = {}
+        self._set_members: dict[int, tuple[list[object], frozenset[str]]] = {}
+        self._sorted_domains: dict[tuple[object, ...], tuple[object, ...]] = {}
+        self._sorted_relations: dict[
+            int, tuple[tuple[tuple[object, ...], ...], tuple[tuple[object, ...], ...]]
+        ] = {}
+        self._referenced: dict[int, tuple[ir.KExpr, frozenset[str] | None]] = {}
+        self._label_prefixes: dict[int, tuple[Span, str]] = {}
+        self._scalar_name_sets: dict[int, tuple[ir.KExpr, frozenset[str] | None]] = {}
+        self._scalar_terms: dict[int, tuple[ir.KExpr, ir.GroundProblem, ScalarTerm]] = {}
+        self._numeric_param_tables: dict[int, tuple[dict[str, object], dict[str, float]]] = {}
+        self._bool_param_tables: dict[int, tuple[dict[str, object], dict[str, float]]] = {}
+        self._indicators: dict[tuple[object, ...], tuple[dimod.ConstrainedQuadraticModel, Any]] = {}
+        self._forced_indicators: dict[int, tuple[Any, dimod.ConstrainedQuadraticModel]] = {}
+        self._flat_params: dict[int, tuple[dict[Any, object], dict[tuple[Any, ...], object]]] = {}
+        self._binder_floats: dict[object, float] = {}
+        self._reported: dict[int, tuple[list[Diagnostic], set[tuple[str, str, Span]]]] = {}
+        # IR expression classes are leaves, so dispatching on the exact type is
+        # equivalent to the isinstance cascades it replaces.
+        self._emit_handlers: dict[type[ir.KExpr], Callable[..., None]] = {
+            ir.KQuantifier: self._emit_quantifier,
+            ir.KTupleQuantifier: self._emit_tuple_quantifier,
+            ir.KAnd: self._emit_and,
+            ir.KName: self._emit_atom,
+            ir.KMethodCall: self._emit_atom,
+            ir.KFuncCall: self._emit_atom,
+            ir.KBoolLit: self._emit_atom,
+            ir.KNot: self._emit_not,
+            ir.KImplies: self._emit_implies,
+            ir.KCompare: self._emit_compare,
+        }
+        self._soft_handlers: dict[type[ir.KExpr], Callable[..., Any | None]] = {
+            ir.KQuantifier: self._soft_quantifier,
+            ir.KTupleQuantifier: self._soft_tuple_quantifier,
+        }
+        self._bool_handlers: dict[type[ir.KExpr], Callable[..., Any | None]] = {
+            ir.KBoolLit: self._bool_expr_lit,
+            ir.KNot: self._bool_expr_not,
+            ir.KAnd: self._bool_expr_and,
+            ir.KOr: self._bool_expr_or,
+            ir.KImplies: self._bool_expr_implies,
+            ir.KCompare: self._bool_expr_compare,
+            ir.KBoolIfThenElse: self._bool_expr_if_then_else,
+        }
+        self._atom_handlers: dict[type[ir.KExpr], Callable[..., Any | None]] = {
+            ir.KName: self._atom_name,
+            ir.KMethodCall: self._atom_method_call,
+            ir.KFuncCall: self._atom_func_call,
+            ir.KBoolLit: self._atom_lit,
+        }
+        self._num_handlers: dict[type[ir.KExpr], Callable[..., Any | None]] = {
+            ir.KNumLit: self._num_lit,
+            ir.KName: self._num_name,
+            ir.KMethodCall: self._num_method_call,
+            ir.KFuncCall: self._num_func_call_expr,
+            ir.KAdd: self._num_add,
+            ir.KSub: self._num_sub,
+            ir.KMul: self._num_mul,
+            ir.KDiv: self._num_div,
+            ir.KNeg: self._num_neg,
+            ir.KIfThenElse: self._num_if_then_else,
+            ir.KSum: self._num_sum,
+        }
+
     def compile(
         self,
         ground: ir.GroundIR,
@@ -71,22 +177,47 @@ class DimodCodegen:
         qubo_weights: Mapping[str, float] | None = None,
     ) -> CodegenResult:
         self._label_counter = 0
+        self._sorted_sets.clear()
+        self._set_members.clear()
+        self._sorted_domains.clear()
+        self._sorted_relations.clear()
+        self._referenced.clear()
+        self._label_prefixes.clear()
+        self._scalar_name_sets.clear()
+        self._scalar_terms.clear()
+        self._flat_params.clear()
+        self._binder_floats.clear()
+        self._reported.clear()
+        self._numeric_param_tables.clear()
+        self._bool_param_tables.clear()
+        self._indicators.clear()
+        self._forced_indicators.clear()
         cqm = _new_cqm()
         diagnostics: list[Diagnostic] = []
         varmap: dict[str, str] = {}
         binaries: dict[str, BinaryVar] = {}
         weights = dict(qubo_weights or {})
 
-        objective = 0.0
+        # Accumulate in place: `+=` on a model copies it whenever the operand
+        # types differ (e.g. Integer finds), making long objectives quadratic.
+        objective = QuadraticModel()
 
         for problem in ground.problems:
             self._declare_find_variables(problem, cqm, binaries, varmap, diagnostics)
 
+            # Soft constraints are lowered after the objective so their aux
+            # variables, constraints and labels keep their place in the model.
+            soft_constraints: list[tuple[ir.KConstraint, float]] = []
             for constraint in problem.constraints:
-                if constraint.kind.value == "must":
+                kind = constraint.kind.value
+                if kind == "must":
                     self._emit_constraint(
                         problem, constraint.expr, cqm, binaries, diagnostics, env={}
                     )
+                    continue
+                weight = SOFT_WEIGHTS.get(kind)
+                if weight is not None:
+                    soft_constraints.append((constraint, weight))
 
             if len(problem.objectives) > 1:
                 objective_terms = self._objective_terms(
@@ -98,7 +229,7 @@ class DimodCodegen:
                     qubo_weights=weights,
                 )
                 for term in objective_terms:
-                    objective += term
+                    self._add_to_objective(objective, term)
             else:
                 for objective_stmt in problem.objectives:
                     expr_obj = self._num_expr(
@@ -110,34 +241,28 @@ class DimodCodegen:
                         cqm=cqm,
                     )
                     if expr_obj is None:
-                        diagnostics.append(
-                            self._unsupported(
-                                objective_stmt.span, "unsupported objective expression"
-                            )
+                        self._report(
+                            diagnostics, objective_stmt.span, "unsupported objective expression"
                         )
                         continue
                     if objective_stmt.kind.value == "minimize":
-                        objective += expr_obj
+                        self._add_to_objective(objective, expr_obj)
                     else:
-                        objective += -expr_obj
+                        self._add_to_objective(objective, -expr_obj)
 
-            for constraint in problem.constraints:
-                if constraint.kind.value in {"should", "nice"}:
-                    penalty = self._soft_penalty(
-                        problem,
-                        constraint.expr,
-                        binaries,
-                        diagnostics,
-                        env={},
-                        cqm=cqm,
-                    )
-                    if penalty is None:
-                        diagnostics.append(
-                            self._unsupported(constraint.span, "unsupported soft constraint")
-                        )
-                        continue
-                    weight = 10.0 if constraint.kind.value == "should" else 1.0
-                    objective += weight * penalty
+            for constraint, weight in soft_constraints:
+                penalty = self._soft_penalty(
+                    problem,
+                    constraint.expr,
+                    binaries,
+                    diagnostics,
+                    env={},
+                    cqm=cqm,
+                )
+                if penalty is None:
+                    self._report(diagnostics, constraint.span, "unsupported soft constraint")
+                    continue
+                self._add_to_objective(objective, weight * penalty)
 
         cqm.set_objective(self._normalize_objective(objective))
         bqm, inverter = _convert_cqm_to_bqm(cqm)
@@ -146,7 +271,9 @@ class DimodCodegen:
             bqm=bqm,
             inverter=inverter,
             varmap=varmap,
-            diagnostics=diagnostics,
+            # Reports outside _report (graph helpers, other codes) can still repeat
+            # once per grounding; keep the first of each.
+            diagnostics=_unique_diagnostics(diagnostics),
         )
 
     def _objective_terms(
@@ -225,9 +352,7 @@ class DimodCodegen:
                 cqm=cqm,
             )
             if expr_obj is None:
-                diagnostics.append(
-                    self._unsupported(objective_stmt.span, "unsupported objective expression")
-                )
+                self._report(diagnostics, objective_stmt.span, "unsupported objective expression")
                 continue
             signed = expr_obj if objective_stmt.kind.value == "minimize" else -expr_obj
             terms.append(float(qubo_weights[name]) * signed)
@@ -251,9 +376,7 @@ class DimodCodegen:
             if isinstance(find.decision_type, ir.KIntDecisionType):
                 lo, hi = self._int_bounds(find.decision_type)
                 if lo is None or hi is None:
-                    diagnostics.append(
-                        self._unsupported(find.span, f"ungrounded Int domain for `{find.name}`")
-                    )
+                    self._report(diagnostics, find.span, f"ungrounded Int domain for `{find.name}`")
                     continue
                 for label, meaning in self._scalar_labels(problem, find):
                     binaries[label] = _new_integer(label, lower_bound=lo, upper_bound=hi)
@@ -263,39 +386,48 @@ class DimodCodegen:
             kind = find.unknown_type.kind
             if kind == "Subset":
                 set_name = find.unknown_type.args[0]
-                elems = problem.set_values.get(set_name)
+                elems = self._sorted_set_values(problem, set_name)
                 if elems is None:
-                    diagnostics.append(
-                        self._unsupported(find.span, f"missing set `{set_name}` for subset")
-                    )
+                    self._report(diagnostics, find.span, f"missing set `{set_name}` for subset")
                     continue
-                for elem in sorted(elems, key=str):
+                for elem in elems:
                     label = self._subset_label(find.name, elem)
                     binaries[label] = _new_binary(label)
                     varmap[label] = f"{find.name}.has({elem})"
             elif kind == "Mapping":
                 dom_name, cod_name = find.unknown_type.args
-                dom = problem.set_values.get(dom_name)
-                cod = problem.set_values.get(cod_name)
+                dom = self._sorted_set_values(problem, dom_name)
+                cod = self._sorted_set_values(problem, cod_name)
                 if dom is None or cod is None:
-                    diagnostics.append(self._unsupported(find.span, "missing set for mapping"))
+                    self._report(diagnostics, find.span, "missing set for mapping")
                     continue
-                for a in sorted(dom, key=str):
-                    row = []
-                    for b in sorted(cod, key=str):
-                        label = self._mapping_label(find.name, a, b)
-                        binaries[label] = _new_binary(label)
-                        row.append(binaries[label])
-                        varmap[label] = f"{find.name}.is({a},{b})"
-                    self._add_numeric_constraint(
-                        cqm,
-                        lhs=sum(row),
-                        rhs=1.0,
-                        op="=",
-                        label=f"implicit_exactly_one:{find.name}:{a}",
-                        span=find.span,
-                        diagnostics=diagnostics,
+                for a in dom:
+                    labels = [self._mapping_label(find.name, a, b) for b in cod]
+                    binaries.update((label, _new_binary(label)) for label in labels)
+                    varmap.update(
+                        (label, f"{find.name}.is({a},{b})")
+                        for label, b in zip(labels, cod, strict=True)
+                    )
+                    row_label = f"implicit_exactly_one:{find.name}:{a}"
+                    if not labels:
+                        self._add_numeric_constraint(
+                            cqm,
+                            lhs=0.0,
+                            rhs=1.0,
+                            op="=",
+                            label=row_label,
+                            span=find.span,
+                            diagnostics=diagnostics,
+                        )
+                        continue
+                    # Emit sum(row) - 1 == 0 straight from the labels; going through
+                    # model arithmetic would copy the row twice per constraint. The
+                    # constant sits on the lhs, as _add_numeric_constraint places it.
+                    cqm.add_variables(dimod.BINARY, labels)
+                    cqm.add_constraint_from_iterable(
+                        ((var, 1.0) for var in labels), "==", rhs=0.0, label=row_label
                     )
+                    cqm.constraints[row_label].lhs.offset = -1.0
             elif kind in {"Matching", "MaximalMatching", "SpanningTree", "Forest", "SteinerTree"}:
                 self._declare_matching_variables(problem, find, cqm, binaries, varmap, diagnostics)
             elif kind == "DirectedAcyclicSubgraph":
@@ -307,9 +439,7 @@ class DimodCodegen:
                     problem, find, cqm, binaries, varmap, diagnostics
                 )
             else:
-                diagnostics.append(
-                    self._unsupported(find.span, f"unsupported unknown kind `{kind}`")
-                )
+                self._report(diagnostics, find.span, f"unsupported unknown kind `{kind}`")
 
     def _declare_directed_acyclic_variables(
         self,
@@ -321,8 +451,8 @@ class DimodCodegen:
         diagnostics: list[Diagnostic],
     ) -> None:
         if len(find.unknown_type.args) != 1:
-            diagnostics.append(
-                self._unsupported(find.span, "`DirectedAcyclicSubgraph` expects one graph argument")
+            self._report(
+                diagnostics, find.span, "`DirectedAcyclicSubgraph` expects one graph argument"
             )
             return
         graph_name = find.unknown_type.args[0]
@@ -330,10 +460,8 @@ class DimodCodegen:
         if graph is None:
             return
         if not graph.directed:
-            diagnostics.append(
-                self._unsupported(
-                    find.span, "DirectedAcyclicSubgraph expects a DirectedGraph structure"
-                )
+            self._report(
+                diagnostics, find.span, "DirectedAcyclicSubgraph expects a DirectedGraph structure"
             )
             return
 
@@ -369,10 +497,8 @@ class DimodCodegen:
         diagnostics: list[Diagnostic],
     ) -> None:
         if len(find.unknown_type.args) != 1:
-            diagnostics.append(
-                self._unsupported(
-                    find.span, f"`{find.unknown_type.kind}` expects one graph argument"
-                )
+            self._report(
+                diagnostics, find.span, f"`{find.unknown_type.kind}` expects one graph argument"
             )
             return
         graph_name = find.unknown_type.args[0]
@@ -393,24 +519,22 @@ class DimodCodegen:
 
         for pos in positions:
             cqm.add_constraint(
-                sum(
-                    (
+                _quicksum(
+                    [
                         binaries[self._hamiltonian_at_label(find.name, pos, vertex)]
                         for vertex in graph.vertices
-                    ),
-                    0.0,
+                    ]
                 )
                 == 1.0,
                 label=f"implicit_hamiltonian_position:{find.name}:{pos}",
             )
         for vertex in graph.vertices:
             cqm.add_constraint(
-                sum(
-                    (
+                _quicksum(
+                    [
                         binaries[self._hamiltonian_at_label(find.name, pos, vertex)]
                         for pos in positions
-                    ),
-                    0.0,
+                    ]
                 )
                 == 1.0,
                 label=f"implicit_hamiltonian_vertex:{find.name}:{vertex}",
@@ -462,7 +586,7 @@ class DimodCodegen:
             self._add_numeric_constraint(
                 cqm,
                 lhs=binaries[self._hamiltonian_uses_label(find.name, u, v)],
-                rhs=sum(terms, 0.0),
+                rhs=_quicksum(terms),
                 op="=",
                 label=f"implicit_hamiltonian_uses:{find.name}:{u}:{v}",
                 span=find.span,
@@ -493,13 +617,12 @@ class DimodCodegen:
     ) -> None:
         expected_args = 2 if find.unknown_type.kind == "SteinerTree" else 1
         if len(find.unknown_type.args) != expected_args:
-            diagnostics.append(
-                self._unsupported(
-                    find.span,
-                    "`SteinerTree` expects graph and terminals arguments"
-                    if find.unknown_type.kind == "SteinerTree"
-                    else "`Matching` expects one graph argument",
-                )
+            self._report(
+                diagnostics,
+                find.span,
+                "`SteinerTree` expects graph and terminals arguments"
+                if find.unknown_type.kind == "SteinerTree"
+                else "`Matching` expects one graph argument",
             )
             return
         graph_name = find.unknown_type.args[0]
@@ -538,11 +661,11 @@ class DimodCodegen:
             )
         elif find.unknown_type.kind == "SpanningTree":
             if not graph.vertices:
-                diagnostics.append(self._unsupported(find.span, "SpanningTree requires vertices"))
+                self._report(diagnostics, find.span, "SpanningTree requires vertices")
                 return
             edge_vars = [binaries[labels.edge_var(edge)] for edge in graph.edges]
             cqm.add_constraint(
-                sum(edge_vars, 0.0) == len(graph.vertices) - 1,
+                _quicksum(edge_vars) == len(graph.vertices) - 1,
                 label=f"implicit_spanning_tree_edge_count:{find.name}",
             )
             add_rooted_connectivity_constraints(
@@ -567,9 +690,7 @@ class DimodCodegen:
             terminal_name = find.unknown_type.args[1]
             raw_terminals = problem.set_values.get(terminal_name)
             if raw_terminals is None:
-                diagnostics.append(
-                    self._unsupported(find.span, f"missing StaticSubset `{terminal_name}`")
-                )
+                self._report(diagnostics, find.span, f"missing StaticSubset `{terminal_name}`")
                 return
             add_steiner_tree_constraints(
                 cqm,
@@ -590,225 +711,254 @@ class DimodCodegen:
         diagnostics: list[Diagnostic],
         env: Mapping[str, object],
     ) -> None:
-        if isinstance(expr, ir.KQuantifier):
-            vals = problem.set_values.get(expr.domain_set)
-            if vals is None:
-                diagnostics.append(
-                    self._unsupported(expr.span, f"unknown set `{expr.domain_set}` in quantifier")
-                )
-                return
-            if expr.kind == "forall":
-                for value in sorted(vals, key=str):
-                    next_env = dict(env)
+        handler = self._emit_handlers.get(type(expr))
+        if handler is None:
+            self._emit_unsupported(problem, expr, cqm, binaries, diagnostics, env)
+            return
+        handler(problem, expr, cqm, binaries, diagnostics, env)
+
+    def _emit_quantifier(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KQuantifier,
+        cqm: dimod.ConstrainedQuadraticModel,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+    ) -> None:
+        vals = self._sorted_set_values(problem, expr.domain_set)
+        if vals is None:
+            self._report(diagnostics, expr.span, f"unknown set `{expr.domain_set}` in quantifier")
+            return
+        # The bodies never retain the env they are given, so a single scope
+        # owned by this quantifier can be rebound for every domain value.
+        next_env = dict(env)
+        if expr.kind == "forall":
+            # Directly nested set foralls expand as one product over this scope
+            # rather than recursing and copying the env once per outer value.
+            # An inner quantifier over an unknown set stays in the body so it is
+            # still only reported when the outer domains are non-empty.
+            names = [expr.var]
+            domains = [vals]
+            body = expr.expr
+            while type(body) is ir.KQuantifier and body.kind == "forall":
+                inner_vals = self._sorted_set_values(problem, body.domain_set)
+                if inner_vals is None:
+                    break
+                names.append(body.var)
+                domains.append(inner_vals)
+                body = body.expr
+            if len(names) == 1:
+                for value in vals:
                     next_env[expr.var] = value
-                    self._emit_constraint(problem, expr.expr, cqm, binaries, diagnostics, next_env)
+                    self._emit_constraint(problem, body, cqm, binaries, diagnostics, next_env)
                 return
+            for combo in product(*domains):
+                next_env.update(zip(names, combo, strict=True))
+                self._emit_constraint(problem, body, cqm, binaries, diagnostics, next_env)
+            return
 
-            indicators = []
-            for value in sorted(vals, key=str):
-                next_env = dict(env)
-                next_env[expr.var] = value
-                indicator = self._bool_expr(
-                    problem, expr.expr, binaries, diagnostics, next_env, cqm=cqm
-                )
-                if indicator is None:
-                    diagnostics.append(
-                        self._unsupported(expr.span, "unsupported exists quantifier body")
-                    )
-                    return
-                indicators.append(indicator)
-            self._add_numeric_constraint(
-                cqm,
-                lhs=sum(indicators, 0.0),
-                rhs=1.0,
-                op=">=",
-                label=self._constraint_label(expr.span),
-                span=expr.span,
-                diagnostics=diagnostics,
+        indicators = []
+        for value in vals:
+            next_env[expr.var] = value
+            indicator = self._bool_expr(
+                problem, expr.expr, binaries, diagnostics, next_env, cqm=cqm
             )
-            return
-        if isinstance(expr, ir.KTupleQuantifier):
-            if expr.kind == "forall":
-                for next_env in self._iter_relation_binder_envs(
-                    problem,
-                    expr.vars,
-                    expr.domain_relation,
-                    env,
-                    expr.span,
-                    "quantifier",
-                    diagnostics,
-                ):
-                    self._emit_constraint(problem, expr.expr, cqm, binaries, diagnostics, next_env)
+            if indicator is None:
+                self._report(diagnostics, expr.span, "unsupported exists quantifier body")
                 return
+            indicators.append(indicator)
+        self._add_numeric_constraint(
+            cqm,
+            lhs=_quicksum(indicators),
+            rhs=1.0,
+            op=">=",
+            label=self._constraint_label(expr.span),
+            span=expr.span,
+            diagnostics=diagnostics,
+        )
 
-            indicators = []
-            for next_env in self._iter_relation_binder_envs(
-                problem, expr.vars, expr.domain_relation, env, expr.span, "quantifier", diagnostics
-            ):
-                indicator = self._bool_expr(
-                    problem, expr.expr, binaries, diagnostics, next_env, cqm=cqm
-                )
-                if indicator is None:
-                    diagnostics.append(
-                        self._unsupported(expr.span, "unsupported exists quantifier body")
-                    )
-                    return
-                indicators.append(indicator)
-            self._add_numeric_constraint(
-                cqm,
-                lhs=sum(indicators, 0.0),
-                rhs=1.0,
-                op=">=",
-                label=self._constraint_label(expr.span),
-                span=expr.span,
-                diagnostics=diagnostics,
-            )
+    def _emit_tuple_quantifier(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KTupleQuantifier,
+        cqm: dimod.ConstrainedQuadraticModel,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+    ) -> None:
+        tuples = self._relation_binder_values(
+            problem, expr.vars, expr.domain_relation, expr.span, "quantifier", diagnostics
+        )
+        # As with set quantifiers, rebind one scope per tuple instead of copying it.
+        next_env = dict(env)
+        if expr.kind == "forall":
+            for values in tuples:
+                next_env.update(zip(expr.vars, values, strict=True))
+                self._emit_constraint(problem, expr.expr, cqm, binaries, diagnostics, next_env)
             return
 
-        if isinstance(expr, ir.KAnd):
-            self._emit_constraint(problem, expr.left, cqm, binaries, diagnostics, env)
-            self._emit_constraint(problem, expr.right, cqm, binaries, diagnostics, env)
-            return
+        indicators = []
+        for values in tuples:
+            next_env.update(zip(expr.vars, values, strict=True))
+            indicator = self._bool_expr(
+                problem, expr.expr, binaries, diagnostics, next_env, cqm=cqm
+            )
+            if indicator is None:
+                self._report(diagnostics, expr.span, "unsupported exists quantifier body")
+                return
+            indicators.append(indicator)
+        self._add_numeric_constraint(
+            cqm,
+            lhs=_quicksum(indicators),
+            rhs=1.0,
+            op=">=",
+            label=self._constraint_label(expr.span),
+            span=expr.span,
+            diagnostics=diagnostics,
+        )
+
+    def _emit_and(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KAnd,
+        cqm: dimod.ConstrainedQuadraticModel,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+    ) -> None:
+        self._emit_constraint(problem, expr.left, cqm, binaries, diagnostics, env)
+        self._emit_constraint(problem, expr.right, cqm, binaries, diagnostics, env)
 
+    def _emit_atom(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KBoolExpr,
+        cqm: dimod.ConstrainedQuadraticModel,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+    ) -> None:
         atom = self._bool_atom(problem, expr, binaries, diagnostics, env)
-        if atom is not None:
-            self._add_numeric_constraint(
-                cqm,
-                lhs=atom,
-                rhs=1.0,
-                op="=",
-                label=self._constraint_label(expr.span),
-                span=expr.span,
-                diagnostics=diagnostics,
-            )
+        if atom is None:
+            self._emit_unsupported(problem, expr, cqm, binaries, diagnostics, env)
             return
+        self._add_numeric_constraint(
+            cqm,
+            lhs=atom,
+            rhs=1.0,
+            op="=",
+            label=self._constraint_label(expr.span),
+            span=expr.span,
+            diagnostics=diagnostics,
+        )
 
-        if isinstance(expr, ir.KNot):
-            atom = self._bool_atom(problem, expr.expr, binaries, diagnostics, env)
-            if atom is not None:
-                self._add_numeric_constraint(
-                    cqm,
-                    lhs=atom,
-                    rhs=0.0,
-                    op="=",
-                    label=self._constraint_label(expr.span),
-                    span=expr.span,
-                    diagnostics=diagnostics,
-                )
-                return
+    def _emit_not(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KNot,
+        cqm: dimod.ConstrainedQuadraticModel,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+    ) -> None:
+        atom = self._bool_atom(problem, expr.expr, binaries, diagnostics, env)
+        if atom is None:
+            self._emit_unsupported(problem, expr, cqm, binaries, diagnostics, env)
+            return
+        self._add_numeric_constraint(
+            cqm,
+            lhs=atom,
+            rhs=0.0,
+            op="=",
+            label=self._constraint_label(expr.span),
+            span=expr.span,
+            diagnostics=diagnostics,
+        )
 
-        if isinstance(expr, ir.KImplies):
-            lhs = self._bool_atom(problem, expr.left, binaries, diagnostics, env)
-            rhs = self._bool_atom(problem, expr.right, binaries, diagnostics, env)
-            if lhs is not None and rhs is not None:
-                self._add_numeric_constraint(
-                    cqm,
-                    lhs=lhs,
-                    rhs=rhs,
-                    op="<=",
-                    label=self._constraint_label(expr.span),
-                    span=expr.span,
-                    diagnostics=diagnostics,
-                )
-                return
-            lhs_indicator = self._bool_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
-            rhs_indicator = self._bool_expr(
-                problem, expr.right, binaries, diagnostics, env, cqm=cqm
-            )
-            if lhs_indicator is not None and rhs_indicator is not None:
-                self._add_numeric_constraint(
-                    cqm,
-                    lhs=lhs_indicator,
-                    rhs=rhs_indicator,
-                    op="<=",
-                    label=self._constraint_label(expr.span),
-                    span=expr.span,
-                    diagnostics=diagnostics,
-                )
-                return
+    def _emit_implies(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KImplies,
+        cqm: dimod.ConstrainedQuadraticModel,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+    ) -> None:
+        lhs = self._bool_atom(problem, expr.left, binaries, diagnostics, env)
+        rhs = self._bool_atom(problem, expr.right, binaries, diagnostics, env)
+        if lhs is None or rhs is None:
+            lhs = self._bool_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
+            rhs = self._bool_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
+        if lhs is None or rhs is None:
+            self._emit_unsupported(problem, expr, cqm, binaries, diagnostics, env)
+            return
+        self._add_numeric_constraint(
+            cqm,
+            lhs=lhs,
+            rhs=rhs,
+            op="<=",
+            label=self._constraint_label(expr.span),
+            span=expr.span,
+            diagnostics=diagnostics,
+        )
 
-        if isinstance(expr, ir.KCompare):
-            lhs = self._num_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
-            rhs = self._num_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
-            if lhs is not None and rhs is not None:
-                label = self._constraint_label(expr.span)
-                if expr.op == "=":
-                    self._add_numeric_constraint(
-                        cqm,
-                        lhs=lhs,
-                        rhs=rhs,
-                        op=expr.op,
-                        label=label,
-                        span=expr.span,
-                        diagnostics=diagnostics,
-                    )
-                    return
-                if expr.op == "!=":
-                    indicator = self._compare_truth_indicator(cqm, expr, lhs, rhs, diagnostics)
-                    if indicator is None:
-                        diagnostics.append(
-                            self._unsupported(expr.span, "unsupported `!=` hard constraint")
-                        )
-                        return
-                    self._add_numeric_constraint(
-                        cqm,
-                        lhs=indicator,
-                        rhs=1.0,
-                        op="=",
-                        label=label,
-                        span=expr.span,
-                        diagnostics=diagnostics,
-                    )
-                    return
-                if expr.op == "<=":
-                    self._add_numeric_constraint(
-                        cqm,
-                        lhs=lhs,
-                        rhs=rhs,
-                        op=expr.op,
-                        label=label,
-                        span=expr.span,
-                        diagnostics=diagnostics,
-                    )
-                    return
-                if expr.op == "<":
-                    self._add_numeric_constraint(
-                        cqm,
-                        lhs=lhs,
-                        rhs=rhs,
-                        op=expr.op,
-                        label=label,
-                        span=expr.span,
-                        diagnostics=diagnostics,
-                    )
-                    return
-                if expr.op == ">=":
-                    self._add_numeric_constraint(
-                        cqm,
-                        lhs=lhs,
-                        rhs=rhs,
-                        op=expr.op,
-                        label=label,
-                        span=expr.span,
-                        diagnostics=diagnostics,
-                    )
-                    return
-                if expr.op == ">":
-                    self._add_numeric_constraint(
-                        cqm,
-                        lhs=lhs,
-                        rhs=rhs,
-                        op=expr.op,
-                        label=label,
-                        span=expr.span,
-                        diagnostics=diagnostics,
-                    )
+    def _emit_compare(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KCompare,
+        cqm: dimod.ConstrainedQuadraticModel,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+    ) -> None:
+        lhs = self._num_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
+        rhs = self._num_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
+        if lhs is None or rhs is None:
+            self._emit_unsupported(problem, expr, cqm, binaries, diagnostics, env)
+            return
+        label = self._constraint_label(expr.span)
+        if expr.op == "!=":
+            indicator = self._compare_truth_indicator(cqm, expr, lhs, rhs, diagnostics)
+            if indicator is None:
+                self._report(diagnostics, expr.span, "unsupported `!=` hard constraint")
+                return
+            if not isinstance(indicator, NUMBER_TYPES):
+                # A reused indicator is already forced to 1 by an earlier grounding.
+                forced = self._forced_indicators.get(id(indicator))
+                if forced is not None and forced[0] is indicator and forced[1] is cqm:
                     return
+                self._forced_indicators[id(indicator)] = (indicator, cqm)
+            lhs, rhs = indicator, 1.0
+            op = "="
+        elif expr.op in COMPARE_OPS:
+            op = expr.op
+        else:
+            self._emit_unsupported(problem, expr, cqm, binaries, diagnostics, env)
+            return
+        self._add_numeric_constraint(
+            cqm,
+            lhs=lhs,
+            rhs=rhs,
+            op=op,
+            label=label,
+            span=expr.span,
+            diagnostics=diagnostics,
+        )
 
+    def _emit_unsupported(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KBoolExpr,
+        cqm: dimod.ConstrainedQuadraticModel,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+    ) -> None:
         message = "unsupported hard constraint shape"
         if self._contains_generated_route_transition(expr):
             message = "unsupported route transition hard constraint shape"
-        diagnostics.append(self._unsupported(expr.span, message))
+        self._report(diagnostics, expr.span, message)
 
     def _contains_generated_route_transition(self, expr: ir.KExpr) -> bool:
         if isinstance(expr, ir.KAnd):
@@ -861,12 +1011,18 @@ class DimodCodegen:
         )
 
     def _is_quadratic_model(self, expr: Any) -> bool:
-        return isinstance(expr, (BinaryQuadraticModel, QuadraticModel))
+        return isinstance(expr, MODEL_TYPES)
+
+    def _add_to_objective(self, objective: QuadraticModel, term: Any) -> None:
+        if self._is_quadratic_model(term):
+            objective.update(term)
+        else:
+            objective.offset += term
 
     def _normalize_objective(self, objective: Any) -> BinaryQuadraticModel | QuadraticModel:
         if self._is_quadratic_model(objective):
             return cast(BinaryQuadraticModel | QuadraticModel, objective)
-        if isinstance(objective, (int, float)):
+        if isinstance(objective, NUMBER_TYPES):
             return BinaryQuadraticModel({}, {}, float(objective), dimod.BINARY)
         raise TypeError(f"unsupported objective type `{type(objective).__name__}`")
 
@@ -880,37 +1036,26 @@ class DimodCodegen:
         span: Span,
         diagnostics: list[Diagnostic],
     ) -> None:
-        if op not in {"=", "<=", "<", ">=", ">"}:
-            diagnostics.append(self._unsupported(span, f"unsupported comparison operator `{op}`"))
+        if op not in COMPARE_OPS:
+            self._report(diagnostics, span, f"unsupported comparison operator `{op}`")
             return
 
         try:
             diff = lhs - rhs
         except TypeError:
-            diagnostics.append(
-                self._unsupported(span, f"unsupported numeric comparison operands for `{op}`")
-            )
+            self._report(diagnostics, span, f"unsupported numeric comparison operands for `{op}`")
             return
 
         if self._is_quadratic_model(diff):
-            integral_diff = self._is_integral_value(diff)
-            if op == "=":
-                sense, bound = "==", 0.0
-            elif op == "<=":
-                sense, bound = "<=", 0.0
-            elif op == "<":
-                sense, bound = "<=", (-1.0 if integral_diff else -CMP_EPS)
-            elif op == ">=":
-                sense, bound = ">=", 0.0
-            else:  # op == ">"
-                sense, bound = ">=", (1.0 if integral_diff else CMP_EPS)
+            sense, integral_bound, bound = CONSTRAINT_SENSES[op]
+            # Only strict comparisons depend on whether the difference is integral.
+            if integral_bound != bound and self._is_integral_value(diff):
+                bound = integral_bound
             cqm.add_constraint_from_model(diff, sense=sense, rhs=bound, label=label)
             return
 
-        if not isinstance(diff, (int, float)):
-            diagnostics.append(
-                self._unsupported(span, f"unsupported numeric comparison operands for `{op}`")
-            )
+        if not isinstance(diff, NUMBER_TYPES):
+            self._report(diagnostics, span, f"unsupported numeric comparison operands for `{op}`")
             return
 
         value = float(diff)
@@ -926,7 +1071,7 @@ class DimodCodegen:
             satisfied = value > 0.0
 
         if not satisfied:
-            diagnostics.append(self._unsupported(span, f"infeasible constant constraint `{op}`"))
+            self._report(diagnostics, span, f"infeasible constant constraint `{op}`")
 
     def _soft_penalty(
         self,
@@ -937,55 +1082,98 @@ class DimodCodegen:
         env: Mapping[str, object],
         cqm: dimod.ConstrainedQuadraticModel,
     ) -> Any | None:
-        if isinstance(expr, ir.KQuantifier):
-            vals = problem.set_values.get(expr.domain_set)
-            if vals is None:
-                diagnostics.append(
-                    self._unsupported(
-                        expr.span, f"unknown set `{expr.domain_set}` in soft quantifier"
-                    )
-                )
-                return None
-            acc = 0.0
-            for value in sorted(vals, key=str):
-                next_env = dict(env)
+        handler = self._soft_handlers.get(type(expr))
+        if handler is None:
+            return self._soft_truth(problem, expr, binaries, diagnostics, env, cqm)
+        return handler(problem, expr, binaries, diagnostics, env, cqm)
+
+    def _soft_quantifier(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KQuantifier,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        vals = self._sorted_set_values(problem, expr.domain_set)
+        if vals is None:
+            self._report(
+                diagnostics, expr.span, f"unknown set `{expr.domain_set}` in soft quantifier"
+            )
+            return None
+        acc = 0.0
+        next_env = dict(env)
+        if vals and self._is_invariant(expr.expr, (expr.var,)):
+            next_env[expr.var] = vals[0]
+            inner = self._soft_penalty(problem, expr.expr, binaries, diagnostics, next_env, cqm=cqm)
+            return None if inner is None else inner * len(vals)
+        negated = isinstance(expr.expr, ir.KNot)
+        atom_expr = expr.expr.expr if isinstance(expr.expr, ir.KNot) else expr.expr
+        if isinstance(atom_expr, ir.KMethodCall):
+            # `forall v: x.has(v)` penalises |D| - sum(x); collect the atoms and
+            # build that linear model in one go instead of summing 1 - atom terms.
+            atoms = []
+            for value in vals:
                 next_env[expr.var] = value
-                inner = self._soft_penalty(
-                    problem,
-                    expr.expr,
-                    binaries,
-                    diagnostics,
-                    next_env,
-                    cqm=cqm,
-                )
-                if inner is None:
+                atom = self._bool_atom(problem, atom_expr, binaries, diagnostics, next_env)
+                if atom is None:
                     return None
-                acc += inner
-            return acc
-        if isinstance(expr, ir.KTupleQuantifier):
-            acc = 0.0
-            for next_env in self._iter_relation_binder_envs(
+                atoms.append(atom)
+            total = _quicksum(atoms)
+            return total if negated else len(atoms) - total
+        for value in vals:
+            next_env[expr.var] = value
+            inner = self._soft_penalty(
                 problem,
-                expr.vars,
-                expr.domain_relation,
-                env,
-                expr.span,
-                "soft quantifier",
+                expr.expr,
+                binaries,
                 diagnostics,
-            ):
-                inner = self._soft_penalty(
-                    problem,
-                    expr.expr,
-                    binaries,
-                    diagnostics,
-                    next_env,
-                    cqm=cqm,
-                )
-                if inner is None:
-                    return None
-                acc += inner
-            return acc
+                next_env,
+                cqm=cqm,
+            )
+            if inner is None:
+                return None
+            acc += inner
+        return acc
 
+    def _soft_tuple_quantifier(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KTupleQuantifier,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        acc = 0.0
+        next_env = dict(env)
+        for values in self._relation_binder_values(
+            problem, expr.vars, expr.domain_relation, expr.span, "soft quantifier", diagnostics
+        ):
+            next_env.update(zip(expr.vars, values, strict=True))
+            inner = self._soft_penalty(
+                problem,
+                expr.expr,
+                binaries,
+                diagnostics,
+                next_env,
+                cqm=cqm,
+            )
+            if inner is None:
+                return None
+            acc += inner
+        return acc
+
+    def _soft_truth(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KBoolExpr,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
         truth = self._bool_expr(
             problem,
             expr,
@@ -1007,65 +1195,126 @@ class DimodCodegen:
         env: Mapping[str, object],
         cqm: dimod.ConstrainedQuadraticModel,
     ) -> Any | None:
-        if isinstance(expr, ir.KBoolLit):
-            return 1.0 if expr.value else 0.0
-        if isinstance(expr, ir.KNot):
-            inner = self._bool_expr(problem, expr.expr, binaries, diagnostics, env, cqm=cqm)
-            return None if inner is None else (1 - inner)
-        if isinstance(expr, ir.KAnd):
-            left = self._bool_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
-            right = self._bool_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
-            if left is None or right is None:
-                return None
-            return self._bool_and(cqm, left, right, span=expr.span, diagnostics=diagnostics)
-        if isinstance(expr, ir.KOr):
-            left = self._bool_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
-            right = self._bool_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
-            if left is None or right is None:
-                return None
-            return self._bool_or(cqm, left, right, span=expr.span, diagnostics=diagnostics)
-        if isinstance(expr, ir.KImplies):
-            left = self._bool_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
-            right = self._bool_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
-            if left is None or right is None:
-                return None
-            return self._bool_or(cqm, 1 - left, right, span=expr.span, diagnostics=diagnostics)
-        if isinstance(expr, ir.KCompare):
-            static_lhs = self._static_value(expr.left, env)
-            static_rhs = self._static_value(expr.right, env)
-            if static_lhs is not None and static_rhs is not None:
-                result = self._static_compare(expr.op, static_lhs, static_rhs)
-                if result is not None:
-                    return result
-
-            lhs = self._num_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
-            rhs = self._num_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
-            if lhs is None or rhs is None:
-                return None
-            indicator = self._compare_truth_indicator(cqm, expr, lhs, rhs, diagnostics)
-            if indicator is None:
-                diagnostics.append(
-                    self._unsupported(
-                        expr.span, "unsupported compare expression in boolean context"
-                    )
-                )
-                return None
-            return indicator
-        if isinstance(expr, ir.KBoolIfThenElse):
-            cond = self._bool_expr(problem, expr.cond, binaries, diagnostics, env, cqm=cqm)
-            tval = self._bool_expr(problem, expr.then_expr, binaries, diagnostics, env, cqm=cqm)
-            eval_ = self._bool_expr(problem, expr.else_expr, binaries, diagnostics, env, cqm=cqm)
-            if cond is None or tval is None or eval_ is None:
-                return None
-            try:
-                return cond * tval + (1 - cond) * eval_
-            except TypeError:
-                diagnostics.append(
-                    self._unsupported(expr.span, "unsupported conditional boolean expression")
-                )
-                return None
+        handler = self._bool_handlers.get(type(expr))
+        if handler is None:
+            return self._bool_atom(problem, expr, binaries, diagnostics, env)
+        return handler(problem, expr, binaries, diagnostics, env, cqm)
 
-        return self._bool_atom(problem, expr, binaries, diagnostics, env)
+    def _bool_expr_lit(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KBoolLit,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        return 1.0 if expr.value else 0.0
+
+    def _bool_expr_not(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KNot,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        inner = self._bool_expr(problem, expr.expr, binaries, diagnostics, env, cqm=cqm)
+        return None if inner is None else (1 - inner)
+
+    def _bool_expr_and(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KAnd,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        left = self._bool_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
+        right = self._bool_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
+        if left is None or right is None:
+            return None
+        return self._bool_and(cqm, left, right, span=expr.span, diagnostics=diagnostics)
+
+    def _bool_expr_or(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KOr,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        left = self._bool_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
+        right = self._bool_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
+        if left is None or right is None:
+            return None
+        return self._bool_or(cqm, left, right, span=expr.span, diagnostics=diagnostics)
+
+    def _bool_expr_implies(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KImplies,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        left = self._bool_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
+        right = self._bool_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
+        if left is None or right is None:
+            return None
+        return self._bool_or(cqm, 1 - left, right, span=expr.span, diagnostics=diagnostics)
+
+    def _bool_expr_compare(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KCompare,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        static_lhs = self._static_value(expr.left, env)
+        static_rhs = self._static_value(expr.right, env)
+        if static_lhs is not None and static_rhs is not None:
+            result = self._static_compare(expr.op, static_lhs, static_rhs)
+            if result is not None:
+                return result
+
+        lhs = self._num_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
+        rhs = self._num_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
+        if lhs is None or rhs is None:
+            return None
+        indicator = self._compare_truth_indicator(cqm, expr, lhs, rhs, diagnostics)
+        if indicator is None:
+            self._report(
+                diagnostics, expr.span, "unsupported compare expression in boolean context"
+            )
+            return None
+        return indicator
+
+    def _bool_expr_if_then_else(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KBoolIfThenElse,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        cond = self._bool_expr(problem, expr.cond, binaries, diagnostics, env, cqm=cqm)
+        tval = self._bool_expr(problem, expr.then_expr, binaries, diagnostics, env, cqm=cqm)
+        eval_ = self._bool_expr(problem, expr.else_expr, binaries, diagnostics, env, cqm=cqm)
+        if cond is None or tval is None or eval_ is None:
+            return None
+        try:
+            return cond * tval + (1 - cond) * eval_
+        except TypeError:
+            self._report(diagnostics, expr.span, "unsupported conditional boolean expression")
+            return None
 
     def _static_value(self, expr: ir.KExpr, env: Mapping[str, object]) -> object | None:
         if isinstance(expr, ir.KName) and expr.name in env:
@@ -1081,7 +1330,7 @@ class DimodCodegen:
             return 1.0 if lhs == rhs else 0.0
         if op == "!=":
             return 1.0 if lhs != rhs else 0.0
-        if not isinstance(lhs, (int, float)) or not isinstance(rhs, (int, float)):
+        if not isinstance(lhs, NUMBER_TYPES) or not isinstance(rhs, NUMBER_TYPES):
             return None
         if op == "<":
             return 1.0 if lhs < rhs else 0.0
@@ -1096,7 +1345,7 @@ class DimodCodegen:
     def _bool_constant(self, value: Any) -> float | None:
         if isinstance(value, bool):
             return 1.0 if value else 0.0
-        if isinstance(value, (int, float)):
+        if isinstance(value, NUMBER_TYPES):
             number = float(value)
             if abs(number) <= BOOL_EPS:
                 return 0.0
@@ -1130,34 +1379,13 @@ class DimodCodegen:
             # Fallback for non-quadratic-safe products (e.g. quadratic * binary).
             pass
 
+        # Both operands are models here and every sense is non-strict, so the
+        # links go straight to the CQM without _add_numeric_constraint's checks.
         z = _new_binary(self._aux_label("and", span))
-        self._add_numeric_constraint(
-            cqm,
-            lhs=z,
-            rhs=left,
-            op="<=",
-            label=self._constraint_label(span),
-            span=span,
-            diagnostics=diagnostics,
-        )
-        self._add_numeric_constraint(
-            cqm,
-            lhs=z,
-            rhs=right,
-            op="<=",
-            label=self._constraint_label(span),
-            span=span,
-            diagnostics=diagnostics,
-        )
-        self._add_numeric_constraint(
-            cqm,
-            lhs=z,
-            rhs=left + right - 1,
-            op=">=",
-            label=self._constraint_label(span),
-            span=span,
-            diagnostics=diagnostics,
-        )
+        add = cqm.add_constraint_from_model
+        add(z - left, sense="<=", rhs=0.0, label=self._constraint_label(span))
+        add(z - right, sense="<=", rhs=0.0, label=self._constraint_label(span))
+        add(z - (left + right - 1), sense=">=", rhs=0.0, label=self._constraint_label(span))
         return z
 
     def _bool_or(
@@ -1187,33 +1415,10 @@ class DimodCodegen:
             pass
 
         z = _new_binary(self._aux_label("or", span))
-        self._add_numeric_constraint(
-            cqm,
-            lhs=z,
-            rhs=left,
-            op=">=",
-            label=self._constraint_label(span),
-            span=span,
-            diagnostics=diagnostics,
-        )
-        self._add_numeric_constraint(
-            cqm,
-            lhs=z,
-            rhs=right,
-            op=">=",
-            label=self._constraint_label(span),
-            span=span,
-            diagnostics=diagnostics,
-        )
-        self._add_numeric_constraint(
-            cqm,
-            lhs=z,
-            rhs=left + right,
-            op="<=",
-            label=self._constraint_label(span),
-            span=span,
-            diagnostics=diagnostics,
-        )
+        add = cqm.add_constraint_from_model
+        add(z - left, sense=">=", rhs=0.0, label=self._constraint_label(span))
+        add(z - right, sense=">=", rhs=0.0, label=self._constraint_label(span))
+        add(z - (left + right), sense="<=", rhs=0.0, label=self._constraint_label(span))
         return z
 
     def _compare_truth_indicator(
@@ -1227,8 +1432,8 @@ class DimodCodegen:
         try:
             diff = lhs - rhs
         except TypeError:
-            diagnostics.append(
-                self._unsupported(expr.span, "compare operands are not numeric in boolean context")
+            self._report(
+                diagnostics, expr.span, "compare operands are not numeric in boolean context"
             )
             return None
         integral_diff = self._is_integral_value(diff)
@@ -1268,12 +1473,25 @@ class DimodCodegen:
                 diagnostics=diagnostics,
             )
         if expr.op in {"=", "!="}:
+            # A repeated difference reuses its `!=` indicator along with the
+            # linking constraint already added for it.
+            key = (
+                None
+                if isinstance(diff, NUMBER_TYPES)
+                else self._indicator_key("ne", diff, strict_hi)
+            )
+            cached = self._indicators.get(key) if key is not None else None
+            if cached is not None and cached[0] is cqm:
+                return cached[1] if expr.op == "!=" else 1 - cached[1]
+            # Both indicators bound the same difference; scan its biases once.
+            bounds = self._quadratic_bounds(diff)
             z_low = self._indicator_leq(
                 cqm,
                 diff,
                 threshold=strict_lo,
                 span=expr.span,
                 diagnostics=diagnostics,
+                bounds=bounds,
             )
             z_high = self._indicator_geq(
                 cqm,
@@ -1281,11 +1499,14 @@ class DimodCodegen:
                 threshold=strict_hi,
                 span=expr.span,
                 diagnostics=diagnostics,
+                bounds=bounds,
             )
             if z_low is None or z_high is None:
                 return None
 
             z_ne = z_low + z_high
+            if key is not None:
+                self._indicators[key] = (cqm, z_ne)
             self._add_numeric_constraint(
                 cqm,
                 lhs=z_ne,
@@ -1299,9 +1520,7 @@ class DimodCodegen:
                 return z_ne
             return 1 - z_ne
 
-        diagnostics.append(
-            self._unsupported(expr.span, f"unsupported comparison operator `{expr.op}`")
-        )
+        self._report(diagnostics, expr.span, f"unsupported comparison operator `{expr.op}`")
         return None
 
     def _indicator_leq(
@@ -1312,15 +1531,15 @@ class DimodCodegen:
         threshold: float,
         span: Span,
         diagnostics: list[Diagnostic],
+        bounds: tuple[float, float] | None = None,
     ) -> Any | None:
-        if isinstance(diff, (int, float)):
+        if isinstance(diff, NUMBER_TYPES):
             return 1.0 if float(diff) <= threshold else 0.0
 
-        bounds = self._quadratic_bounds(diff)
         if bounds is None:
-            diagnostics.append(
-                self._unsupported(span, "unable to bound compare expression for <= indicator")
-            )
+            bounds = self._quadratic_bounds(diff)
+        if bounds is None:
+            self._report(diagnostics, span, "unable to bound compare expression for <= indicator")
             return None
         lo, hi = bounds
         if hi <= threshold:
@@ -1328,7 +1547,12 @@ class DimodCodegen:
         if lo > threshold:
             return 0.0
 
+        key = self._indicator_key("leq", diff, threshold)
+        cached = self._indicators.get(key)
+        if cached is not None and cached[0] is cqm:
+            return cached[1]
         z = _new_binary(self._aux_label("leq", span))
+        self._indicators[key] = (cqm, z)
         self._add_numeric_constraint(
             cqm,
             lhs=diff,
@@ -1358,15 +1582,15 @@ class DimodCodegen:
         threshold: float,
         span: Span,
         diagnostics: list[Diagnostic],
+        bounds: tuple[float, float] | None = None,
     ) -> Any | None:
-        if isinstance(diff, (int, float)):
+        if isinstance(diff, NUMBER_TYPES):
             return 1.0 if float(diff) >= threshold else 0.0
 
-        bounds = self._quadratic_bounds(diff)
         if bounds is None:
-            diagnostics.append(
-                self._unsupported(span, "unable to bound compare expression for >= indicator")
-            )
+            bounds = self._quadratic_bounds(diff)
+        if bounds is None:
+            self._report(diagnostics, span, "unable to bound compare expression for >= indicator")
             return None
         lo, hi = bounds
         if lo >= threshold:
@@ -1374,7 +1598,12 @@ class DimodCodegen:
         if hi < threshold:
             return 0.0
 
+        key = self._indicator_key("geq", diff, threshold)
+        cached = self._indicators.get(key)
+        if cached is not None and cached[0] is cqm:
+            return cached[1]
         z = _new_binary(self._aux_label("geq", span))
+        self._indicators[key] = (cqm, z)
         if abs(lo - threshold) > INTEGRAL_TOL:
             self._add_numeric_constraint(
                 cqm,
@@ -1397,23 +1626,31 @@ class DimodCodegen:
             )
         return z
 
+    def _indicator_key(self, kind: str, diff: Any, threshold: float) -> tuple[object, ...]:
+        # Equal differences get the same indicator wherever they were grounded,
+        # so key on the model contents rather than on the expression.
+        model = cast(BinaryQuadraticModel | QuadraticModel, diff)
+        return (
+            kind,
+            threshold,
+            float(model.offset),
+            frozenset(model.linear.items()),
+            frozenset((frozenset(pair), bias) for pair, bias in model.quadratic.items()),
+        )
+
     def _quadratic_bounds(self, expr: Any) -> tuple[float, float] | None:
         if not self._is_quadratic_model(expr):
             return None
 
         model = cast(BinaryQuadraticModel | QuadraticModel, expr)
         lo = float(model.offset)
-        hi = float(model.offset)
-
-        for bias in model.linear.values():
+        hi = lo
+        for bias in chain(model.linear.values(), model.quadratic.values()):
             b = float(bias)
-            lo += min(0.0, b)
-            hi += max(0.0, b)
-
-        for bias in model.quadratic.values():
-            b = float(bias)
-            lo += min(0.0, b)
-            hi += max(0.0, b)
+            if b < 0.0:
+                lo += b
+            else:
+                hi += b
         return lo, hi
 
     def _is_integral_value(self, expr: Any) -> bool:
@@ -1426,8 +1663,12 @@ class DimodCodegen:
         if not self._is_quadratic_model(expr):
             return False
         model = cast(BinaryQuadraticModel | QuadraticModel, expr)
-        values = [model.offset, *model.linear.values(), *model.quadratic.values()]
-        return all(abs(float(value) - round(float(value))) <= INTEGRAL_TOL for value in values)
+        # Stop at the first fractional bias instead of materialising every bias.
+        for value in chain((model.offset,), model.linear.values(), model.quadratic.values()):
+            bias = float(value)
+            if abs(bias - round(bias)) > INTEGRAL_TOL:
+                return False
+        return True
 
     def _aux_label(self, prefix: str, span: Span) -> str:
         self._label_counter += 1
@@ -1441,53 +1682,82 @@ class DimodCodegen:
         diagnostics: list[Diagnostic],
         env: Mapping[str, object],
     ) -> Any | None:
-        if isinstance(expr, ir.KName):
-            if expr.name in binaries:
-                return binaries[expr.name]
-            if expr.name in problem.params and not isinstance(problem.params[expr.name], dict):
-                val = problem.params[expr.name]
-                truth = self._bool_constant(val)
-                if truth is not None:
-                    return truth
+        handler = self._atom_handlers.get(type(expr))
+        if handler is None:
             return None
-        if isinstance(expr, ir.KMethodCall):
-            if (
-                isinstance(expr.target, ir.KName)
-                and expr.name == "has"
-                and len(expr.args) == 1
-                and expr.target.name in problem.set_values
-            ):
-                arg = self._resolve_name_arg(problem, expr.args[0], diagnostics, env)
-                if arg is None:
-                    diagnostics.append(
-                        self._unsupported(expr.span, "unsupported static set lookup")
-                    )
-                    return None
-                members = frozenset(str(member) for member in problem.set_values[expr.target.name])
-                return 1.0 if arg in members else 0.0
-            label = self._method_label(problem, expr, diagnostics, env)
-            if label is None:
-                diagnostics.append(self._unsupported(expr.span, "unsupported method call atom"))
-                return None
-            if label not in binaries:
-                diagnostics.append(self._unsupported(expr.span, f"unknown variable `{label}`"))
-                return None
-            return binaries[label]
-        if isinstance(expr, ir.KFuncCall):
-            label = self._indexed_scalar_label(problem, expr, diagnostics, env)
-            if label is not None:
-                if label not in binaries:
-                    diagnostics.append(self._unsupported(expr.span, f"unknown variable `{label}`"))
-                    return None
-                return binaries[label]
-            value = self._bool_func_call(problem, expr, diagnostics, env)
-            if value is None:
-                diagnostics.append(self._unsupported(expr.span, "unsupported function call atom"))
+        return handler(problem, expr, binaries, diagnostics, env)
+
+    def _atom_name(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KName,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+    ) -> Any | None:
+        var = binaries.get(expr.name)
+        if var is not None:
+            return var
+        return self._bool_params(problem).get(expr.name)
+
+    def _atom_method_call(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KMethodCall,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+    ) -> Any | None:
+        set_values = problem.set_values
+        if (
+            isinstance(expr.target, ir.KName)
+            and expr.name == "has"
+            and len(expr.args) == 1
+            and expr.target.name in set_values
+        ):
+            arg = self._resolve_name_arg(problem, expr.args[0], diagnostics, env)
+            if arg is None:
+                self._report(diagnostics, expr.span, "unsupported static set lookup")
                 return None
-            return value
-        if isinstance(expr, ir.KBoolLit):
-            return 1.0 if expr.value else 0.0
-        return None
+            return 1.0 if arg in self._set_member_strings(problem, expr.target.name) else 0.0
+        label = self._method_label(problem, expr, diagnostics, env)
+        if label is None:
+            self._report(diagnostics, expr.span, "unsupported method call atom")
+            return None
+        var = binaries.get(label)
+        if var is None:
+            self._report(diagnostics, expr.span, f"unknown variable `{label}`")
+        return var
+
+    def _atom_func_call(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KFuncCall,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+    ) -> Any | None:
+        label = self._indexed_scalar_label(problem, expr, diagnostics, env)
+        if label is not None:
+            var = binaries.get(label)
+            if var is None:
+                self._report(diagnostics, expr.span, f"unknown variable `{label}`")
+            return var
+        value = self._bool_func_call(problem, expr, diagnostics, env)
+        if value is None:
+            self._report(diagnostics, expr.span, "unsupported function call atom")
+            return None
+        return value
+
+    def _atom_lit(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KBoolLit,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+    ) -> Any | None:
+        return 1.0 if expr.value else 0.0
 
     def _num_expr(
         self,
@@ -1498,125 +1768,495 @@ class DimodCodegen:
         env: Mapping[str, object],
         cqm: dimod.ConstrainedQuadraticModel,
     ) -> Any | None:
-        if isinstance(expr, ir.KNumLit):
-            return expr.value
-        if isinstance(expr, ir.KName):
-            if expr.name in binaries:
-                return binaries[expr.name]
-            if expr.name in env:
-                bound_value = env[expr.name]
-                try:
-                    return float(cast(Any, bound_value))
-                except (TypeError, ValueError):
-                    diagnostics.append(
-                        self._unsupported(
-                            expr.span, f"non-numeric binder `{expr.name}` in numeric context"
-                        )
-                    )
-                    return None
-            if expr.name in problem.params and not isinstance(problem.params[expr.name], dict):
-                val = problem.params[expr.name]
-                if isinstance(val, (int, float)):
-                    return float(val)
-            diagnostics.append(
-                self._unsupported(expr.span, f"unsupported numeric name `{expr.name}`")
+        handler = self._num_handlers.get(type(expr))
+        if handler is None:
+            self._report(
+                diagnostics, expr.span, f"unsupported numeric expression `{type(expr).__name__}`"
             )
             return None
-        if isinstance(expr, ir.KMethodCall):
-            return self._bool_atom(problem, expr, binaries, diagnostics, env)
-        if isinstance(expr, ir.KFuncCall):
-            label = self._indexed_scalar_label(problem, expr, diagnostics, env)
-            if label is not None:
-                if label not in binaries:
-                    diagnostics.append(self._unsupported(expr.span, f"unknown variable `{label}`"))
-                    return None
-                return binaries[label]
-            num_value = self._num_func_call(problem, expr, diagnostics, env)
-            if num_value is None:
-                diagnostics.append(
-                    self._unsupported(expr.span, "unsupported numeric function call")
-                )
-                return None
-            return num_value
-        if isinstance(expr, ir.KAdd):
-            left = self._num_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
-            right = self._num_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
-            return None if left is None or right is None else (left + right)
-        if isinstance(expr, ir.KSub):
-            left = self._num_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
-            right = self._num_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
-            return None if left is None or right is None else (left - right)
-        if isinstance(expr, ir.KMul):
-            left = self._num_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
-            right = self._num_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
-            if left is None or right is None:
-                return None
+        return handler(problem, expr, binaries, diagnostics, env, cqm)
+
+    def _num_lit(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KNumLit,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        return expr.value
+
+    def _num_name(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KName,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        var = binaries.get(expr.name)
+        if var is not None:
+            return var
+        if expr.name in env:
+            bound_value = env[expr.name]
             try:
-                return left * right
-            except TypeError:
-                diagnostics.append(
-                    Diagnostic(
-                        severity=Severity.ERROR,
-                        code="QSOL3002",
-                        message="unsupported multiplication shape for backend `dimod-cqm-v1`",
-                        span=expr.span,
-                        help=self._backend_degree_help(),
-                    )
+                number = self._binder_floats.get(bound_value)
+                if number is None:
+                    number = self._binder_floats[bound_value] = float(cast(Any, bound_value))
+                return number
+            except (TypeError, ValueError):
+                self._report(
+                    diagnostics, expr.span, f"non-numeric binder `{expr.name}` in numeric context"
                 )
                 return None
-        if isinstance(expr, ir.KDiv):
-            left = self._num_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
-            right = self._num_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
-            if left is None or right is None:
-                return None
-            try:
-                return left / right
-            except ZeroDivisionError:
-                diagnostics.append(self._unsupported(expr.span, "division by zero"))
-                return None
-            except TypeError:
-                diagnostics.append(
-                    self._unsupported(expr.span, "unsupported numeric division operands")
+        value = self._numeric_params(problem).get(expr.name)
+        if value is not None:
+            return value
+        self._report(diagnostics, expr.span, f"unsupported numeric name `{expr.name}`")
+        return None
+
+    def _num_method_call(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KMethodCall,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        return self._atom_method_call(problem, expr, binaries, diagnostics, env)
+
+    def _num_func_call_expr(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KFuncCall,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        label = self._indexed_scalar_label(problem, expr, diagnostics, env)
+        if label is not None:
+            var = binaries.get(label)
+            if var is None:
+                self._report(diagnostics, expr.span, f"unknown variable `{label}`")
+            return var
+        num_value = self._num_func_call(problem, expr, diagnostics, env)
+        if num_value is None:
+            self._report(diagnostics, expr.span, "unsupported numeric function call")
+            return None
+        return num_value
+
+    def _num_add(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KAdd,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        left = self._num_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
+        right = self._num_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
+        return None if left is None or right is None else (left + right)
+
+    def _num_sub(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KSub,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        left = self._num_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
+        right = self._num_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
+        return None if left is None or right is None else (left - right)
+
+    def _num_mul(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KMul,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        left = self._num_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
+        right = self._num_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
+        if left is None or right is None:
+            return None
+        try:
+            return left * right
+        except TypeError:
+            diagnostics.append(
+                Diagnostic(
+                    severity=Severity.ERROR,
+                    code="QSOL3002",
+                    message="unsupported multiplication shape for backend `dimod-cqm-v1`",
+                    span=expr.span,
+                    help=self._backend_degree_help(),
                 )
+            )
+            return None
+
+    def _num_div(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KDiv,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        left = self._num_expr(problem, expr.left, binaries, diagnostics, env, cqm=cqm)
+        right = self._num_expr(problem, expr.right, binaries, diagnostics, env, cqm=cqm)
+        if left is None or right is None:
+            return None
+        try:
+            return left / right
+        except ZeroDivisionError:
+            self._report(diagnostics, expr.span, "division by zero")
+            return None
+        except TypeError:
+            self._report(diagnostics, expr.span, "unsupported numeric division operands")
+            return None
+
+    def _num_neg(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KNeg,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        inner = self._num_expr(problem, expr.expr, binaries, diagnostics, env, cqm=cqm)
+        return None if inner is None else -inner
+
+    def _num_if_then_else(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KIfThenElse,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        cond = self._bool_expr(problem, expr.cond, binaries, diagnostics, env, cqm=cqm)
+        tval = self._num_expr(problem, expr.then_expr, binaries, diagnostics, env, cqm=cqm)
+        eval_ = self._num_expr(problem, expr.else_expr, binaries, diagnostics, env, cqm=cqm)
+        if cond is None or tval is None or eval_ is None:
+            return None
+        try:
+            return cond * tval + (1 - cond) * eval_
+        except TypeError:
+            self._report(diagnostics, expr.span, "unsupported conditional numeric expression")
+            return None
+
+    def _num_sum(
+        self,
+        problem: ir.GroundProblem,
+        expr: ir.KSum,
+        binaries: dict[str, BinaryVar],
+        diagnostics: list[Diagnostic],
+        env: Mapping[str, object],
+        cqm: dimod.ConstrainedQuadraticModel,
+    ) -> Any | None:
+        envs = self._iter_binder_envs(
+            problem, expr.comp.binders, env, expr.span, "sum", diagnostics
+        )
+        binder_vars = tuple(
+            var
+            for binder in expr.comp.binders
+            for var in (binder.vars if isinstance(binder, ir.KTupleCompBinder) else (binder.var,))
+        )
+        if envs and self._is_invariant(expr.comp.term, binder_vars):
+            term = self._num_expr(problem, expr.comp.term, binaries, diagnostics, envs[0], cqm=cqm)
+            return None if term is None else term * len(envs)
+        acc = 0.0
+        scalar_names = self._scalar_names(expr.comp.term)
+        if scalar_names is not None and scalar_names.isdisjoint(
+            find.name for find in problem.finds
+        ):
+            # Parameter arithmetic only: evaluate to plain floats without model dispatch.
+            scalar_term = self._scalar_term(problem, expr.comp.term)
+            for next_env in envs:
+                value = scalar_term(next_env, diagnostics)
+                if value is None:
+                    return None
+                acc += value
+            return acc
+        for next_env in envs:
+            term = self._num_expr(
+                problem,
+                expr.comp.term,
+                binaries,
+                diagnostics,
+                next_env,
+                cqm=cqm,
+            )
+            if term is None:
                 return None
-        if isinstance(expr, ir.KNeg):
-            inner = self._num_expr(problem, expr.expr, binaries, diagnostics, env, cqm=cqm)
-            return None if inner is None else -inner
-        if isinstance(expr, ir.KIfThenElse):
-            cond = self._bool_expr(problem, expr.cond, binaries, diagnostics, env, cqm=cqm)
-            tval = self._num_expr(problem, expr.then_expr, binaries, diagnostics, env, cqm=cqm)
-            eval_ = self._num_expr(problem, expr.else_expr, binaries, diagnostics, env, cqm=cqm)
-            if cond is None or tval is None or eval_ is None:
-                return None
-            try:
-                return cond * tval + (1 - cond) * eval_
-            except TypeError:
-                diagnostics.append(
-                    self._unsupported(expr.span, "unsupported conditional numeric expression")
-                )
+            acc += term
+        return acc
+
+    def _scalar_names(self, expr: ir.KExpr) -> frozenset[str] | None:
+        key = id(expr)
+        cached = self._scalar_name_sets.get(key)
+        if cached is not None and cached[0] is expr:
+            return cached[1]
+        result: frozenset[str] | None
+        if isinstance(expr, ir.KNumLit):
+            result = frozenset()
+        elif isinstance(expr, (ir.KName, ir.KFuncCall)):
+            result = frozenset({expr.name})
+        elif isinstance(expr, (ir.KAdd, ir.KSub, ir.KMul, ir.KDiv)):
+            left = self._scalar_names(expr.left)
+            right = self._scalar_names(expr.right)
+            result = None if left is None or right is None else left | right
+        elif isinstance(expr, ir.KNeg):
+            result = self._scalar_names(expr.expr)
+        else:
+            result = None
+        self._scalar_name_sets[key] = (expr, result)
+        return result
+
+    def _scalar_term(self, problem: ir.GroundProblem, expr: ir.KExpr) -> ScalarTerm:
+        cached = self._scalar_terms.get(id(expr))
+        if cached is not None and cached[0] is expr and cached[1] is problem:
+            return cached[2]
+        term = self._build_scalar_term(problem, expr)
+        if not isinstance(expr, ir.KNumLit) and self._scalar_names(expr) == frozenset():
+            # Literal-only subtree: fold it to one constant unless evaluating it
+            # reports something (division by zero), which must repeat per use.
+            scratch: list[Diagnostic] = []
+            value = term({}, scratch)
+            if value is not None and not scratch:
+                term = self._literal_term(value)
+        self._scalar_terms[id(expr)] = (expr, problem, term)
+        return term
+
+    def _literal_term(self, value: float) -> ScalarTerm:
+        def literal(env: Mapping[str, object], diagnostics: list[Diagnostic]) -> float:
+            return value
+
+        return literal
+
+    def _build_scalar_term(self, problem: ir.GroundProblem, expr: ir.KExpr) -> ScalarTerm:
+        # Mirrors _num_expr (including its diagnostics) for trees accepted by
+        # _scalar_names that reference no decision variables. The tree is turned
+        # into closures once, so each sum element only pays for the arithmetic.
+        span = expr.span
+        if isinstance(expr, ir.KNumLit):
+            return self._literal_term(expr.value)
+        if isinstance(expr, ir.KName):
+            name = expr.name
+            # Resolve the param once; a binder of the same name still shadows it.
+            param_value = self._numeric_params(problem).get(name)
+            # Binder values repeat across sums, so parse each one only once.
+            floats = self._binder_floats
+
+            def name_value(
+                env: Mapping[str, object], diagnostics: list[Diagnostic]
+            ) -> float | None:
+                if name in env:
+                    bound = env[name]
+                    try:
+                        number = floats.get(bound)
+                        if number is None:
+                            number = floats[bound] = float(cast(Any, bound))
+                        return number
+                    except (TypeError, ValueError):
+                        self._report(
+                            diagnostics, span, f"non-numeric binder `{name}` in numeric context"
+                        )
+                        return None
+                if param_value is None:
+                    self._report(diagnostics, span, f"unsupported numeric name `{name}`")
+                return param_value
+
+            return name_value
+        if isinstance(expr, ir.KFuncCall):
+            call = expr
+
+            def call_value(
+                env: Mapping[str, object], diagnostics: list[Diagnostic]
+            ) -> float | None:
+                value = self._param_call_value(problem, call, diagnostics, env)
+                if isinstance(value, bool):
+                    return 1.0 if value else 0.0
+                if isinstance(value, NUMBER_TYPES):
+                    return float(value)
+                self._report(diagnostics, span, "unsupported numeric function call")
                 return None
-        if isinstance(expr, ir.KSum):
-            acc = 0.0
-            for next_env in self._iter_binder_envs(
-                problem, expr.comp.binders, env, expr.span, "sum", diagnostics
+
+            table = problem.params.get(call.name)
+            if not isinstance(table, dict) or not all(
+                isinstance(arg, ir.KName) for arg in call.args
             ):
-                term = self._num_expr(
-                    problem,
-                    expr.comp.term,
-                    binaries,
-                    diagnostics,
-                    next_env,
-                    cqm=cqm,
-                )
-                if term is None:
+                return call_value
+            # Indexed param read by binder names: resolve the indices inline and
+            # hit the flattened table directly; anything unusual (missing index,
+            # sub-table, non-number) takes the general path for its diagnostics.
+            flat = self._flat_param(table)
+            index_names = tuple(cast(ir.KName, arg).name for arg in call.args)
+            unbound = tuple(
+                self._resolve_name_arg(problem, arg, diagnostics=[], env={}) or ""
+                for arg in call.args
+            )
+            if len(index_names) == 1:
+                index_name = index_names[0]
+                index_default = unbound[0]
+
+                def vector_value(
+                    env: Mapping[str, object], diagnostics: list[Diagnostic]
+                ) -> float | None:
+                    index = str(env[index_name]) if index_name in env else index_default
+                    value = flat.get((index,))
+                    if isinstance(value, NUMBER_TYPES):
+                        return float(value)
+                    return call_value(env, diagnostics)
+
+                return vector_value
+            slots = tuple(zip(index_names, unbound, strict=True))
+
+            def indexed_value(
+                env: Mapping[str, object], diagnostics: list[Diagnostic]
+            ) -> float | None:
+                key = tuple([str(env[name]) if name in env else default for name, default in slots])
+                value = flat.get(key)
+                if isinstance(value, NUMBER_TYPES):
+                    return float(value)
+                return call_value(env, diagnostics)
+
+            return indexed_value
+        if isinstance(expr, ir.KNeg):
+            inner = self._scalar_term(problem, expr.expr)
+
+            def negated(env: Mapping[str, object], diagnostics: list[Diagnostic]) -> float | None:
+                value = inner(env, diagnostics)
+                return None if value is None else -value
+
+            return negated
+        if not isinstance(expr, (ir.KAdd, ir.KSub, ir.KMul, ir.KDiv)):
+
+            def unsupported(env: Mapping[str, object], diagnostics: list[Diagnostic]) -> None:
+                return None
+
+            return unsupported
+        left = self._scalar_term(problem, expr.left)
+        right = self._scalar_term(problem, expr.right)
+        if isinstance(expr, ir.KDiv):
+
+            def quotient(env: Mapping[str, object], diagnostics: list[Diagnostic]) -> float | None:
+                lhs = left(env, diagnostics)
+                rhs = right(env, diagnostics)
+                if lhs is None or rhs is None:
                     return None
-                acc += term
-            return acc
+                if rhs == 0:
+                    self._report(diagnostics, span, "division by zero")
+                    return None
+                return lhs / rhs
 
-        diagnostics.append(
-            self._unsupported(expr.span, f"unsupported numeric expression `{type(expr).__name__}`")
-        )
-        return None
+            return quotient
+        op = SCALAR_OPS[type(expr)]
+
+        def arithmetic(env: Mapping[str, object], diagnostics: list[Diagnostic]) -> float | None:
+            lhs = left(env, diagnostics)
+            rhs = right(env, diagnostics)
+            if lhs is None or rhs is None:
+                return None
+            return op(lhs, rhs)
+
+        return arithmetic
+
+    def _is_invariant(self, expr: ir.KExpr, binder_vars: tuple[str, ...]) -> bool:
+        names = self._referenced_names(expr)
+        return names is not None and names.isdisjoint(binder_vars)
+
+    def _referenced_names(self, expr: ir.KExpr) -> frozenset[str] | None:
+        key = id(expr)
+        cached = self._referenced.get(key)
+        if cached is not None and cached[0] is expr:
+            return cached[1]
+        children: tuple[ir.KExpr, ...]
+        if isinstance(expr, ir.KName):
+            children = ()
+        elif isinstance(expr, (ir.KNumLit, ir.KBoolLit)):
+            children = ()
+        elif isinstance(
+            expr,
+            (ir.KAnd, ir.KOr, ir.KImplies, ir.KCompare, ir.KAdd, ir.KSub, ir.KMul, ir.KDiv),
+        ):
+            children = (expr.left, expr.right)
+        elif isinstance(expr, (ir.KNot, ir.KNeg, ir.KQuantifier, ir.KTupleQuantifier)):
+            children = (expr.expr,)
+        elif isinstance(expr, ir.KFuncCall):
+            children = expr.args
+        elif isinstance(expr, ir.KMethodCall):
+            children = (expr.target, *expr.args)
+        elif isinstance(expr, (ir.KIfThenElse, ir.KBoolIfThenElse)):
+            children = (expr.cond, expr.then_expr, expr.else_expr)
+        elif isinstance(expr, ir.KSum):
+            children = (expr.comp.term,)
+        else:
+            self._referenced[key] = (expr, None)
+            return None
+        names: set[str] = {expr.name} if isinstance(expr, ir.KName) else set()
+        result: frozenset[str] | None = None
+        for child in children:
+            child_names = self._referenced_names(child)
+            if child_names is None:
+                break
+            names |= child_names
+        else:
+            result = frozenset(names)
+        self._referenced[key] = (expr, result)
+        return result
+
+    def _sorted_set_values(
+        self, problem: ir.GroundProblem, set_name: str
+    ) -> tuple[object, ...] | None:
+        vals = problem.set_values.get(set_name)
+        if vals is None:
+            return None
+        cached = self._sorted_sets.get(id(vals))
+        if cached is None or cached[0] is not vals:
+            # Problems of one GroundIR often declare the same set; share one sort.
+            # Equal values may render differently (1 vs 1.0 vs True), so the key
+            # carries each element's type and label alongside the value.
+            key = tuple((type(v), str(v), v) for v in vals)
+            try:
+                ordered = self._sorted_domains.get(key)
+            except TypeError:  # unhashable elements cannot be shared
+                ordered = tuple(sorted(vals, key=str))
+            if ordered is None:
+                ordered = self._sorted_domains[key] = tuple(sorted(vals, key=str))
+            cached = self._sorted_sets[id(vals)] = (vals, ordered)
+        return cached[1]
+
+    def _set_member_strings(self, problem: ir.GroundProblem, set_name: str) -> frozenset[str]:
+        vals = problem.set_values[set_name]
+        cached = self._set_members.get(id(vals))
+        if cached is None or cached[0] is not vals:
+            cached = (vals, frozenset(str(member) for member in vals))
+            self._set_members[id(vals)] = cached
+        return cached[1]
+
+    def _sorted_relation_values(
+        self, problem: ir.GroundProblem, relation_name: str
+    ) -> tuple[tuple[object, ...], ...] | None:
+        tuples = problem.relation_values.get(relation_name)
+        if tuples is None:
+            return None
+        cached = self._sorted_relations.get(id(tuples))
+        if cached is None or cached[0] is not tuples:
+            ordered = tuple(sorted(tuples, key=lambda item: tuple(str(value) for value in item)))
+            cached = self._sorted_relations[id(tuples)] = (tuples, ordered)
+        return cached[1]
 
     def _iter_binder_envs(
         self,
@@ -1645,15 +2285,13 @@ class DimodCodegen:
                     )
                 envs = relation_envs
                 continue
-            vals = problem.set_values.get(binder.domain_set)
+            vals = self._sorted_set_values(problem, binder.domain_set)
             if vals is None:
-                diagnostics.append(
-                    self._unsupported(span, f"unknown set `{binder.domain_set}` in {context}")
-                )
+                self._report(diagnostics, span, f"unknown set `{binder.domain_set}` in {context}")
                 return []
             set_envs: list[dict[str, object]] = []
             for base_env in envs:
-                for val in sorted(vals, key=str):
+                for val in vals:
                     bound_env = dict(base_env)
                     bound_env[binder.var] = val
                     set_envs.append(bound_env)
@@ -1670,25 +2308,35 @@ class DimodCodegen:
         context: str,
         diagnostics: list[Diagnostic],
     ) -> list[dict[str, object]]:
-        tuples = problem.relation_values.get(relation_name)
-        if tuples is None:
-            diagnostics.append(
-                self._unsupported(span, f"unknown relation `{relation_name}` in {context}")
-            )
-            return []
         out: list[dict[str, object]] = []
-        for values in sorted(tuples, key=lambda item: tuple(str(value) for value in item)):
-            if len(values) != len(vars):
-                diagnostics.append(
-                    self._unsupported(span, f"relation `{relation_name}` arity mismatch")
-                )
-                return []
+        for values in self._relation_binder_values(
+            problem, vars, relation_name, span, context, diagnostics
+        ):
             next_env = dict(env)
             for name, value in zip(vars, values, strict=True):
                 next_env[name] = value
             out.append(next_env)
         return out
 
+    def _relation_binder_values(
+        self,
+        problem: ir.GroundProblem,
+        vars: tuple[str, ...],
+        relation_name: str,
+        span: Span,
+        context: str,
+        diagnostics: list[Diagnostic],
+    ) -> tuple[tuple[object, ...], ...]:
+        tuples = self._sorted_relation_values(problem, relation_name)
+        if tuples is None:
+            self._report(diagnostics, span, f"unknown relation `{relation_name}` in {context}")
+            return ()
+        arity = len(vars)
+        if any(len(values) != arity for values in tuples):
+            self._report(diagnostics, span, f"relation `{relation_name}` arity mismatch")
+            return ()
+        return tuples
+
     def _bool_func_call(
         self,
         problem: ir.GroundProblem,
@@ -1743,7 +2391,7 @@ class DimodCodegen:
             return None
         if isinstance(value, bool):
             return 1.0 if value else 0.0
-        if isinstance(value, (int, float)):
+        if isinstance(value, NUMBER_TYPES):
             return float(value)
         return None
 
@@ -1762,7 +2410,12 @@ class DimodCodegen:
             key = self._resolve_name_arg(problem, arg, diagnostics, env)
             if key is None:
                 return None
-            resolved_keys.append(str(key))
+            resolved_keys.append(key)
+        if isinstance(value, dict):
+            flat_value = self._flat_param(value).get(tuple(resolved_keys))
+            if flat_value is not None:
+                return flat_value
+        # Slow path: walk the nested tables again to report the first missing index.
         if isinstance(value, dict) and len(resolved_keys) > 1:
             tuple_key = ",".join(resolved_keys)
             if tuple_key in value:
@@ -1773,13 +2426,57 @@ class DimodCodegen:
             if key is None or not isinstance(value, dict):
                 return None
             if key not in value:
-                diagnostics.append(
-                    self._unsupported(expr.span, f"unknown index `{key}` for param `{expr.name}`")
+                self._report(
+                    diagnostics, expr.span, f"unknown index `{key}` for param `{expr.name}`"
                 )
                 return None
             value = value[key]
         return value
 
+    def _numeric_params(self, problem: ir.GroundProblem) -> dict[str, float]:
+        params = problem.params
+        cached = self._numeric_param_tables.get(id(params))
+        if cached is None or cached[0] is not params:
+            table = {
+                name: float(value)
+                for name, value in params.items()
+                if isinstance(value, NUMBER_TYPES)
+            }
+            cached = self._numeric_param_tables[id(params)] = (params, table)
+        return cached[1]
+
+    def _bool_params(self, problem: ir.GroundProblem) -> dict[str, float]:
+        params = problem.params
+        cached = self._bool_param_tables.get(id(params))
+        if cached is None or cached[0] is not params:
+            # Only scalar params within BOOL_EPS of 0 or 1 can stand for a truth value.
+            table: dict[str, float] = {}
+            for name, value in self._numeric_params(problem).items():
+                truth = self._bool_constant(value)
+                if truth is not None:
+                    table[name] = truth
+            cached = self._bool_param_tables[id(params)] = (params, table)
+        return cached[1]
+
+    def _flat_param(self, table: dict[Any, object]) -> dict[tuple[Any, ...], object]:
+        cached = self._flat_params.get(id(table))
+        if cached is not None and cached[0] is table:
+            return cached[1]
+        flat: dict[tuple[Any, ...], object] = {}
+        pending: list[tuple[tuple[Any, ...], object]] = [((), table)]
+        while pending:
+            path, value = pending.pop()
+            flat[path] = value
+            if isinstance(value, dict):
+                pending.extend(((*path, key), item) for key, item in value.items())
+        # Comma-joined top-level keys (`"a,b": v`) take precedence over nested
+        # tables for multi-index calls; resolve that once here, not per call.
+        for key, item in table.items():
+            if isinstance(key, str) and "," in key:
+                flat[tuple(key.split(","))] = item
+        self._flat_params[id(table)] = (table, flat)
+        return flat
+
     def _method_label(
         self,
         problem: ir.GroundProblem,
@@ -1996,11 +2693,10 @@ class DimodCodegen:
             return None
         expected_arity = self._scalar_index_arity(problem, find)
         if len(expr.args) != expected_arity:
-            diagnostics.append(
-                self._unsupported(
-                    expr.span,
-                    f"scalar decision `{expr.name}` expects {expected_arity} index argument(s)",
-                )
+            self._report(
+                diagnostics,
+                expr.span,
+                f"scalar decision `{expr.name}` expects {expected_arity} index argument(s)",
             )
             return None
         keys: list[str] = []
@@ -2029,11 +2725,15 @@ class DimodCodegen:
         env: Mapping[str, object],
     ) -> str | None:
         if isinstance(expr, ir.KName):
-            if expr.name in env:
-                return str(env[expr.name])
-            if expr.name in problem.params and not isinstance(problem.params[expr.name], dict):
-                return str(problem.params[expr.name])
-            return expr.name
+            name = expr.name
+            if name in env:
+                return str(env[name])
+            params = problem.params
+            if name in params:
+                value = params[name]
+                if not isinstance(value, dict):
+                    return str(value)
+            return name
         if isinstance(expr, ir.KNumLit):
             return str(int(expr.value)) if float(expr.value).is_integer() else str(expr.value)
         if isinstance(expr, ir.KFuncCall):
@@ -2067,17 +2767,35 @@ class DimodCodegen:
 
     def _constraint_label(self, span: Span) -> str:
         self._label_counter += 1
-        return f"c:{span.line}:{span.col}:{span.end_line}:{span.end_col}:{self._label_counter}"
+        cached = self._label_prefixes.get(id(span))
+        if cached is None or cached[0] is not span:
+            cached = (span, f"c:{span.line}:{span.col}:{span.end_line}:{span.end_col}:")
+            self._label_prefixes[id(span)] = cached
+        return f"{cached[1]}{self._label_counter}"
+
+    def _report(self, diagnostics: list[Diagnostic], span: Span, message: str) -> None:
+        # Grounding re-evaluates one IR node per binding, so the same failure
+        # recurs per element; skip it before the Diagnostic and help are built.
+        cached = self._reported.get(id(diagnostics))
+        if cached is None or cached[0] is not diagnostics:
+            cached = self._reported[id(diagnostics)] = (diagnostics, set())
+        key = (self._unsupported_code(message), message, span)
+        if key in cached[1]:
+            return
+        cached[1].add(key)
+        diagnostics.append(self._unsupported(span, message))
 
-    def _unsupported(self, span: Span, message: str) -> Diagnostic:
-        code = "QSOL3001"
+    def _unsupported_code(self, message: str) -> str:
         if "degree exceeds backend support" in message:
-            code = "QSOL3001"
-        elif "multiplication" in message:
-            code = "QSOL3002"
+            return "QSOL3001"
+        if "multiplication" in message:
+            return "QSOL3002"
+        return "QSOL3001"
+
+    def _unsupported(self, span: Span, message: str) -> Diagnostic:
         return Diagnostic(
             severity=Severity.ERROR,
-            code=code,
+            code=self._unsupported_code(message),
             message=message,
             span=span,
             help=self._help_for_backend_message(message),
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import json
 import logging
+import shutil
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
@@ -12,6 +14,9 @@ from qsol.lower.ir import BackendArtifacts
 
 LOGGER = logging.getLogger(__name__)
 
+COPY_CHUNK_SIZE = 1 << 20
+JSON_WRITE_BATCH = 1 << 14
+
 
 def export_artifacts(
     outdir: str | Path, output_format: str, codegen_result: CodegenResult
@@ -23,15 +28,13 @@ def export_artifacts(
     cqm_path = out / "model.cqm"
     bqm_path = out / "model.bqm"
     LOGGER.debug("Writing CQM artifact to %s", cqm_path)
-    with cqm_path.open("wb") as fp:
-        cqm_file = codegen_result.cqm.to_file()
+    with cqm_path.open("wb") as fp, codegen_result.cqm.to_file() as cqm_file:
         cqm_file.seek(0)
-        fp.write(cqm_file.read())
+        shutil.copyfileobj(cqm_file, fp, COPY_CHUNK_SIZE)
     LOGGER.debug("Writing BQM artifact to %s", bqm_path)
-    with bqm_path.open("wb") as fp:
-        bqm_file = codegen_result.bqm.to_file()
+    with bqm_path.open("wb") as fp, codegen_result.bqm.to_file() as bqm_file:
         bqm_file.seek(0)
-        fp.write(bqm_file.read())
+        shutil.copyfileobj(bqm_file, fp, COPY_CHUNK_SIZE)
 
     varmap_path = out / "varmap.json"
     LOGGER.debug("Writing variable map artifact to %s", varmap_path)
@@ -46,7 +49,7 @@ def export_artifacts(
         else _to_ising_json(codegen_result.bqm)
     )
     LOGGER.debug("Writing model payload (%s) to %s", output_format, format_path)
-    format_path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+    _write_payload(format_path, payload)
 
     explain_path = out / "explain.json"
     LOGGER.debug("Writing diagnostics explanation to %s", explain_path)
@@ -109,6 +112,15 @@ def dimod_model_stats(
     }
 
 
+def _write_payload(path: Path, payload: dict[str, object]) -> None:
+    # Stream the encoder's chunks to disk in batches instead of joining one string
+    # that can be several times the size of a large model.
+    chunks = json.JSONEncoder(indent=2, sort_keys=True).iterencode(payload)
+    with path.open("w", encoding="utf-8") as fp:
+        while batch := "".join(islice(chunks, JSON_WRITE_BATCH)):
+            fp.write(batch)
+
+
 def _to_qubo_json(bqm: Any) -> dict[str, object]:
     qubo, offset = bqm.to_qubo()
     entries = [
@@ -1385,20 +1385,34 @@ def _check_shape(
     sets: Mapping[str, list[object]],
     relations: Mapping[str, tuple[tuple[object, ...], ...]],
 ) -> bool:
-    if not dims:
-        return not isinstance(value, dict)
-    if not isinstance(value, dict):
-        return False
-
-    dim = dims[0]
-    if dim in relations:
-        expected = sorted(_tuple_key(row) for row in relations[dim])
-    else:
-        expected = sorted(str(v) for v in sets.get(dim, []))
-    keys = sorted(str(k) for k in value.keys())
-    if expected and keys != expected:
-        return False
-    return all(_check_shape(v, dims[1:], sets, relations) for v in value.values())
+    # Resolve each dimension's expected keys once instead of at every node; a
+    # duplicate-free key set matches iff the sizes agree and the sets are equal.
+    expected: list[tuple[frozenset[str], int] | list[str] | None] = []
+    for elems in _dim_keys(dims, sets, relations):
+        if not elems:
+            expected.append(None)
+            continue
+        unique = frozenset(elems)
+        expected.append((unique, len(elems)) if len(unique) == len(elems) else sorted(elems))
+
+    depth_limit = len(dims)
+    stack: list[tuple[object, int]] = [(value, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if depth == depth_limit:
+            if isinstance(node, dict):
+                return False
+            continue
+        if not isinstance(node, dict):
+            return False
+        keys = expected[depth]
+        if isinstance(keys, tuple):
+            if len(node) != keys[1] or {str(k) for k in node} != keys[0]:
+                return False
+        elif keys is not None and sorted(str(k) for k in node) != keys:
+            return False
+        stack.extend((child, depth + 1) for child in node.values())
+    return True
 
 
 def _expand_indexed_default(
@@ -1410,14 +1424,27 @@ def _expand_indexed_default(
     if not dims:
         return default_value
 
-    dim = dims[0]
-    if dim in relations:
-        elems = sorted(_tuple_key(row) for row in relations[dim])
-    else:
-        elems = sorted(str(v) for v in sets.get(dim, []))
-    return {
-        elem: _expand_indexed_default(default_value, dims[1:], sets, relations) for elem in elems
-    }
+    levels = [sorted(elems) for elems in _dim_keys(dims, sets, relations)]
+
+    def build(depth: int) -> dict[str, object]:
+        if depth == len(levels) - 1:
+            return dict.fromkeys(levels[depth], default_value)
+        return {elem: build(depth + 1) for elem in levels[depth]}
+
+    return build(0)
+
+
+def _dim_keys(
+    dims: list[str],
+    sets: Mapping[str, list[object]],
+    relations: Mapping[str, tuple[tuple[object, ...], ...]],
+) -> list[list[str]]:
+    return [
+        [_tuple_key(row) for row in relations[dim]]
+        if dim in relations
+        else [str(v) for v in sets.get(dim, [])]
+        for dim in dims
+    ]
 
 
 def _tuple_key(values: tuple[object, ...]) -> str:
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+
 from qsol.lower import ir
 from qsol.parse import ast
 
@@ -147,9 +149,9 @@ def _lower_expr(expr: ast.Expr) -> ir.KExpr:
             span=expr.span, name=expr.name, args=tuple(_lower_expr(a) for a in expr.args)
         )
     if isinstance(expr, ast.NameRef):
-        return ir.KName(span=expr.span, name=expr.name)
+        return ir.KName(span=expr.span, name=sys.intern(expr.name))
     if isinstance(expr, ast.DomainRef):
-        return ir.KName(span=expr.span, name=expr.name)
+        return ir.KName(span=expr.span, name=sys.intern(expr.name))
     raise TypeError(f"Unsupported AST expression in lowering: {type(expr)}")
 
 
@@ -188,7 +190,7 @@ def _lower_bool(expr: ast.BoolExpr) -> ir.KBoolExpr:
         return ir.KQuantifier(
             span=expr.span,
             kind=expr.kind,
-            var=expr.var,
+            var=sys.intern(expr.var),
             domain_set=expr.domain_set,
             expr=_lower_bool(expr.expr),
         )
@@ -196,7 +198,7 @@ def _lower_bool(expr: ast.BoolExpr) -> ir.KBoolExpr:
         return ir.KTupleQuantifier(
             span=expr.span,
             kind=expr.kind,
-            vars=expr.vars,
+            vars=tuple(sys.intern(var) for var in expr.vars),
             domain_relation=expr.domain_relation,
             expr=_lower_bool(expr.expr),
         )
@@ -209,7 +211,7 @@ def _lower_bool(expr: ast.BoolExpr) -> ir.KBoolExpr:
             else_expr=_lower_bool(expr.else_expr),
         )
     if isinstance(expr, ast.NameRef):
-        return ir.KName(span=expr.span, name=expr.name)
+        return ir.KName(span=expr.span, name=sys.intern(expr.name))
     raise TypeError(f"Unsupported bool expression: {type(expr)}")
 
 
@@ -245,7 +247,7 @@ def _lower_num(expr: ast.NumExpr) -> ir.KNumExpr:
             span=expr.span, name=expr.name, args=tuple(_lower_expr(a) for a in expr.args)
         )
     if isinstance(expr, ast.NameRef):
-        return ir.KName(span=expr.span, name=expr.name)
+        return ir.KName(span=expr.span, name=sys.intern(expr.name))
     if isinstance(expr, ast.NumAggregate):
         if not isinstance(expr.comp, ast.NumComprehension):
             raise TypeError("Count aggregate should be desugared before lowering")
@@ -265,10 +267,12 @@ def _lower_comp_binder(
     if isinstance(binder, ast.TupleCompBinder):
         return ir.KTupleCompBinder(
             span=binder.span,
-            vars=binder.vars,
+            vars=tuple(sys.intern(var) for var in binder.vars),
             domain_relation=binder.domain_relation,
         )
-    return ir.KCompBinder(span=binder.span, var=binder.var, domain_set=binder.domain_set)
+    return ir.KCompBinder(
+        span=binder.span, var=sys.intern(binder.var), domain_set=binder.domain_set
+    )
 
 
 def _lower_relation_expr(expr: ast.RelationExpr) -> ir.KRelationExpr:
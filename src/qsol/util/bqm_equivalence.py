@@ -61,12 +61,15 @@ def check_qsol_program_bqm_equivalence(
     filename: str = "<input>",
     atol: float = 1e-9,
     console: Console | None = None,
+    compiled: tuple[dimod.BinaryQuadraticModel | None, list[Diagnostic]] | None = None,
 ) -> BQMEquivalenceReport:
-    compiled_bqm, diagnostics = _compile_program_to_bqm(
-        program_text=program_text,
-        instance=instance or {},
-        filename=filename,
-    )
+    if compiled is None:
+        compiled = _compile_program_to_bqm(
+            program_text=program_text,
+            instance=instance or {},
+            filename=filename,
+        )
+    compiled_bqm, diagnostics = compiled
     report = _build_equivalence_report(compiled_bqm, bqm, diagnostics, atol=atol)
     _print_equivalence_report(report, console=console)
     return report
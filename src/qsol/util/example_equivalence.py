@@ -104,6 +104,19 @@ def sample_best_assignment(
     return solver.sample(bqm).first
 
 
+def chosen_subset_elements(sample: Mapping[object, int | float], prefix: str) -> list[str]:
+    cut = len(prefix)
+    chosen: list[str] = []
+    for name, value in sample.items():
+        if value != 1:
+            continue
+        label = str(name)
+        if label.startswith(prefix):
+            chosen.append(label[cut:].removesuffix("]"))
+    chosen.sort()
+    return chosen
+
+
 def run_bqm_equivalence_example(spec: EquivalenceExampleSpec[SolveResultT]) -> int:
     args = _parse_args(spec)
     runtime_options = RuntimeSolveOptions(
@@ -126,7 +139,8 @@ def run_bqm_equivalence_example(spec: EquivalenceExampleSpec[SolveResultT]) -> i
     else:
         spec.render_solution(console, custom_solution, spec.custom_solution_title)
 
-    qsol_bqm, _ = _compile_qsol_bqm(
+    # Compile once and reuse the result for both the runtime and structural checks.
+    qsol_bqm, qsol_diagnostics = _compile_qsol_bqm(
         program_text=program_text,
         instance=instance,
         filename=str(qsol_path),
@@ -161,6 +175,7 @@ def run_bqm_equivalence_example(spec: EquivalenceExampleSpec[SolveResultT]) -> i
         filename=str(qsol_path),
         atol=spec.atol,
         console=console,
+        compiled=(qsol_bqm, qsol_diagnostics),
     )
 
     if not report.equivalent and not spec.require_structural_equivalence:
@@ -46,6 +46,14 @@ A = ["a1", "a2"]
     assert Path(unit.artifacts.format_path or "").exists()
     assert Path(unit.artifacts.varmap_path or "").exists()
 
+    assert unit.compiled_model is not None
+    payload = json.loads(Path(unit.artifacts.format_path or "").read_text(encoding="utf-8"))
+    qubo, offset = unit.compiled_model.bqm.to_qubo()
+    assert payload["offset"] == offset
+    assert {(term["u"], term["v"]): term["bias"] for term in payload["terms"]} == {
+        (str(u), str(v)): bias for (u, v), bias in qubo.items()
+    }
+
 
 def test_compile_supports_indexed_numeric_param_default_and_calls(tmp_path: Path) -> None:
     source = """
@@ -2438,3 +2446,33 @@ A = ["a1", "a2"]
     assert unit.artifacts is not None
     assert Path(unit.artifacts.cqm_path or "").exists()
     assert Path(unit.artifacts.bqm_path or "").exists()
+
+
+def test_compile_reuses_not_equal_indicator_across_groundings(tmp_path: Path) -> None:
+    source = """
+problem NeReuse {
+  set V;
+  set W;
+  find S : Subset(V);
+  must forall i in W: sum(if S.has(v) then 1 else 0 for v in V) != 2;
+  minimize sum(if S.has(v) then 1 else 0 for v in V);
+}
+"""
+    unit = compile_source(
+        source,
+        options=CompileOptions(
+            filename="ne_reuse.qsol",
+            instance_payload={
+                "problem": "NeReuse",
+                "sets": {"V": ["a", "b", "c"], "W": ["w1", "w2", "w3"]},
+            },
+            outdir=str(tmp_path / "out"),
+            output_format="qubo",
+        ),
+    )
+
+    assert unit.compiled_model is not None
+    constraints = unit.compiled_model.cqm.constraints.values()
+    shapes = [(c.sense.value, c.rhs, tuple(sorted(c.lhs.linear.items()))) for c in constraints]
+    assert len(shapes) == len(set(shapes)) == 5
+    assert sum(1 for sense, _, _ in shapes if sense == "==") == 1
@@ -5,12 +5,14 @@ from pathlib import Path
 
 import dimod
 
-from qsol.backend.dimod_codegen import DimodCodegen
+from qsol.backend.dimod_codegen import CodegenResult, DimodCodegen
 from qsol.backend.instance import (
+    _check_shape,
     _eval_int_expr,
     _eval_num_expr,
     _eval_static_bool,
     _eval_static_value,
+    _expand_indexed_default,
     _iter_static_binder_envs,
     instantiate_ir,
     load_instance,
@@ -95,6 +97,29 @@ def test_load_instance_requires_object_payload(tmp_path: Path) -> None:
         raise AssertionError("expected ValueError")
 
 
+def test_load_instance_keeps_stdlib_json_semantics(tmp_path: Path) -> None:
+    path = tmp_path / "values.json"
+    path.write_text(
+        '{"params": {"big": 123456789012345678901234567890, "nan": NaN, "inf": -Infinity}}',
+        encoding="utf-8",
+    )
+    params = load_instance(path)["params"]
+    assert isinstance(params, dict)
+    assert params["big"] == 123456789012345678901234567890
+    assert isinstance(params["big"], int)
+    assert params["nan"] != params["nan"]
+    assert params["inf"] == float("-inf")
+
+    bom_path = tmp_path / "bom.json"
+    bom_path.write_bytes(b"\xef\xbb\xbf" + json.dumps({"sets": {}}).encode())
+    try:
+        load_instance(bom_path)
+    except ValueError as exc:
+        assert "BOM" in str(exc)
+    else:
+        raise AssertionError("expected ValueError")
+
+
 def test_instance_selection_execution_config_and_range_errors() -> None:
     assert read_execution_config({}).runtime is None
     assert (
@@ -1609,3 +1634,802 @@ def test_dimod_codegen_reports_infeasible_constant_hard_not_equal() -> None:
     result = DimodCodegen().compile(ir.GroundIR(span=span, problems=(problem,)))
     assert any(diag.is_error for diag in result.diagnostics)
     assert any(diag.message == "infeasible constant constraint `=`" for diag in result.diagnostics)
+
+
+def test_dimod_codegen_sorts_each_domain_once_per_problem() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="SortedDomains",
+        set_values={"A": ["b", "a", "c"]},
+        params={},
+        finds=(),
+        constraints=(),
+        objectives=(),
+        relation_values={"R": (("b", "a"), ("a", "b"))},
+    )
+    codegen = DimodCodegen()
+
+    values = codegen._sorted_set_values(problem, "A")
+    assert values == ("a", "b", "c")
+    assert codegen._sorted_set_values(problem, "A") is values
+    assert codegen._sorted_set_values(problem, "Missing") is None
+
+    tuples = codegen._sorted_relation_values(problem, "R")
+    assert tuples == (("a", "b"), ("b", "a"))
+    assert codegen._sorted_relation_values(problem, "R") is tuples
+
+
+def test_dimod_codegen_hoists_binder_invariant_sum_terms() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="InvariantSum",
+        set_values={"A": ["a1", "a2", "a3"]},
+        params={"w": 1.5, "c": {"a1": 1.0, "a2": 2.0, "a3": 4.0}},
+        finds=(),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+    cqm = dimod.ConstrainedQuadraticModel()
+    diagnostics: list = []
+    x = dimod.Binary("x")
+
+    def _sum(term: ir.KNumExpr) -> object:
+        expr = ir.KSum(
+            span=span, comp=ir.KNumComprehension(span=span, term=term, var="i", domain_set="A")
+        )
+        return codegen._num_expr(problem, expr, {"x": x}, diagnostics, {}, cqm=cqm)
+
+    invariant = ir.KMul(
+        span=span, left=ir.KName(span=span, name="w"), right=ir.KName(span=span, name="x")
+    )
+    hoisted = _sum(invariant)
+    assert codegen._is_quadratic_model(hoisted)
+    assert hoisted.linear["x"] == 4.5
+
+    dependent = ir.KFuncCall(span=span, name="c", args=(ir.KName(span=span, name="i"),))
+    assert not codegen._is_invariant(dependent, ("i",))
+    assert _sum(dependent) == 7.0
+    assert not diagnostics
+
+
+def test_dimod_codegen_hoisted_sum_term_creates_its_indicator_once() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="InvariantIndicator",
+        set_values={"A": ["a1", "a2", "a3"]},
+        params={},
+        finds=(),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+    cqm = dimod.ConstrainedQuadraticModel()
+    diagnostics: list = []
+    binaries = {"x": dimod.Binary("x"), "y": dimod.Binary("y")}
+    one = ir.KNumLit(span=span, value=1.0)
+    term = ir.KIfThenElse(
+        span=span,
+        cond=ir.KCompare(
+            span=span,
+            op=">=",
+            left=ir.KAdd(
+                span=span, left=ir.KName(span=span, name="x"), right=ir.KName(span=span, name="y")
+            ),
+            right=ir.KNumLit(span=span, value=2.0),
+        ),
+        then_expr=one,
+        else_expr=ir.KNumLit(span=span, value=0.0),
+    )
+    expr = ir.KSum(
+        span=span, comp=ir.KNumComprehension(span=span, term=term, var="i", domain_set="A")
+    )
+
+    total = codegen._num_expr(problem, expr, binaries, diagnostics, {}, cqm=cqm)
+
+    # The term is lowered once and scaled, so a single `>=` indicator and its
+    # linking constraint are added rather than one per element of A.
+    aux = [label for label in cqm.variables if str(label).startswith("aux:geq:")]
+    assert len(aux) == 1
+    assert len(cqm.constraints) == 1
+    assert codegen._is_quadratic_model(total)
+    assert dict(total.linear) == {aux[0]: 3.0}
+    assert not diagnostics
+
+
+def test_dimod_codegen_soft_forall_over_atoms_builds_linear_penalty() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="SoftAtoms",
+        set_values={"A": ["a1", "a2"]},
+        params={},
+        finds=(_subset_find("S", "A"),),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+    cqm = dimod.ConstrainedQuadraticModel()
+    diagnostics: list = []
+    binaries = {f"S.has[{elem}]": dimod.Binary(f"S.has[{elem}]") for elem in ("a1", "a2")}
+    has = ir.KMethodCall(
+        span=span,
+        target=ir.KName(span=span, name="S"),
+        name="has",
+        args=(ir.KName(span=span, name="a"),),
+    )
+
+    def _forall(body: ir.KBoolExpr) -> object:
+        expr = ir.KQuantifier(span=span, kind="forall", var="a", domain_set="A", expr=body)
+        return codegen._soft_penalty(problem, expr, binaries, diagnostics, {}, cqm=cqm)
+
+    penalty = _forall(has)
+    assert penalty.offset == 2.0
+    assert dict(penalty.linear) == {"S.has[a1]": -1.0, "S.has[a2]": -1.0}
+
+    negated = _forall(ir.KNot(span=span, expr=has))
+    assert negated.offset == 0.0
+    assert dict(negated.linear) == {"S.has[a1]": 1.0, "S.has[a2]": 1.0}
+    assert not diagnostics
+
+
+def test_dimod_codegen_shares_sorted_domains_across_problems() -> None:
+    span = _span()
+    problems = [
+        ir.GroundProblem(
+            span=span,
+            name=name,
+            set_values={"A": ["b", "a"]},
+            params={},
+            finds=(),
+            constraints=(),
+            objectives=(),
+        )
+        for name in ("P1", "P2")
+    ]
+    codegen = DimodCodegen()
+
+    first, second = (codegen._sorted_set_values(problem, "A") for problem in problems)
+    assert first == ("a", "b")
+    assert first is second
+
+
+def test_dimod_codegen_mapping_rows_keep_constant_on_lhs() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="MapRows",
+        set_values={"A": ["a1", "a2"], "B": ["b1", "b2", "b3"]},
+        params={},
+        finds=(_mapping_find("M", "A", "B"),),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+    cqm = dimod.ConstrainedQuadraticModel()
+    diagnostics: list = []
+    codegen._declare_find_variables(problem, cqm, {}, {}, diagnostics)
+
+    # Same stored form as a row lowered through _add_numeric_constraint.
+    reference = dimod.ConstrainedQuadraticModel()
+    row = cqm.constraints["implicit_exactly_one:M:a1"]
+    reference.add_constraint_from_model(
+        dimod.quicksum(dimod.Binary(v) for v in row.lhs.variables) - 1.0, "==", label="ref"
+    )
+    for a in ("a1", "a2"):
+        constraint = cqm.constraints[f"implicit_exactly_one:M:{a}"]
+        assert constraint.lhs.offset == -1.0
+        assert constraint.rhs == 0.0
+        assert dict(constraint.lhs.linear) == {f"M.is[{a},{b}]": 1.0 for b in ("b1", "b2", "b3")}
+    assert row.to_polystring() == reference.constraints["ref"].to_polystring()
+    assert not diagnostics
+
+
+def test_dimod_codegen_keeps_equal_but_distinct_domains_apart() -> None:
+    span = _span()
+    codegen = DimodCodegen()
+
+    def _values(values: list[object]) -> tuple[object, ...] | None:
+        problem = ir.GroundProblem(
+            span=span,
+            name="P",
+            set_values={"A": values},
+            params={},
+            finds=(),
+            constraints=(),
+            objectives=(),
+        )
+        return codegen._sorted_set_values(problem, "A")
+
+    assert [str(v) for v in _values([1, 2]) or ()] == ["1", "2"]
+    assert [str(v) for v in _values([1.0, 2.0]) or ()] == ["1.0", "2.0"]
+    assert [str(v) for v in _values([1]) or ()] == ["1"]
+    assert [str(v) for v in _values([True]) or ()] == ["True"]
+
+
+def test_dimod_codegen_scalar_sum_fast_path_matches_model_path() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="ScalarSum",
+        set_values={"A": ["a1", "a2", "a3"]},
+        params={"w": 2, "flag": {"a1": True, "a2": False, "a3": True}, "c": {"a1": 1.0}},
+        finds=(),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+    cqm = dimod.ConstrainedQuadraticModel()
+    i = ir.KName(span=span, name="i")
+
+    def _call(name: str) -> ir.KFuncCall:
+        return ir.KFuncCall(span=span, name=name, args=(i,))
+
+    def _sum(term: ir.KNumExpr) -> tuple[object, list]:
+        diagnostics: list = []
+        expr = ir.KSum(
+            span=span, comp=ir.KNumComprehension(span=span, term=term, var="i", domain_set="A")
+        )
+        return codegen._num_expr(problem, expr, {}, diagnostics, {}, cqm=cqm), diagnostics
+
+    term = ir.KNeg(
+        span=span,
+        expr=ir.KDiv(
+            span=span,
+            left=ir.KAdd(span=span, left=_call("flag"), right=ir.KNumLit(span=span, value=1.0)),
+            right=ir.KName(span=span, name="w"),
+        ),
+    )
+    assert codegen._scalar_names(term) == frozenset({"flag", "w"})
+    assert _sum(term) == (-2.5, [])
+
+    missing_value, missing_diags = _sum(_call("c"))
+    assert missing_value is None
+    assert [d.message for d in missing_diags] == [
+        "unknown index `a2` for param `c`",
+        "unsupported numeric function call",
+    ]
+
+    zero = ir.KDiv(span=span, left=_call("flag"), right=ir.KNumLit(span=span, value=0.0))
+    zero_value, zero_diags = _sum(zero)
+    assert zero_value is None
+    assert [d.message for d in zero_diags] == ["division by zero"]
+
+
+def test_dimod_codegen_param_calls_use_flattened_tables() -> None:
+    span = _span()
+    weights = {"a1": {"b1": 3.0, "b2": None}, "a1,b2": 5.0}
+    problem = ir.GroundProblem(
+        span=span,
+        name="FlatParams",
+        set_values={},
+        params={"W": weights},
+        finds=(),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+    diagnostics: list = []
+
+    def _call(*args: str) -> object:
+        expr = ir.KFuncCall(
+            span=span, name="W", args=tuple(ir.KName(span=span, name=arg) for arg in args)
+        )
+        return codegen._param_call_value(problem, expr, diagnostics, {})
+
+    assert _call("a1", "b1") == 3.0
+    assert _call("a1", "b2") == 5.0
+    assert _call("a1") == {"b1": 3.0, "b2": None}
+    assert codegen._flat_param(weights)[("a1", "b1")] == 3.0
+    assert codegen._flat_param(weights)[("a1", "b2")] == 5.0
+    assert not diagnostics
+
+    assert _call("a1", "b3") is None
+    assert [d.message for d in diagnostics] == ["unknown index `b3` for param `W`"]
+
+
+def test_dimod_codegen_reports_repeated_grounding_failures_once() -> None:
+    span = _span()
+    has = ir.KMethodCall(
+        span=span,
+        target=ir.KName(span=span, name="S"),
+        name="has",
+        args=(ir.KName(span=span, name="a"),),
+    )
+    problem = ir.GroundProblem(
+        span=span,
+        name="RepeatedFailure",
+        set_values={"A": ["a1", "a2", "a3"]},
+        params={},
+        finds=(_subset_find("S", "A"),),
+        constraints=(
+            ir.KConstraint(
+                span=span,
+                kind=ast.ConstraintKind.MUST,
+                expr=ir.KQuantifier(
+                    span=span,
+                    kind="forall",
+                    var="a",
+                    domain_set="A",
+                    expr=ir.KOr(span=span, left=has, right=has),
+                ),
+            ),
+        ),
+        objectives=(),
+    )
+
+    result = DimodCodegen().compile(ir.GroundIR(span=span, problems=(problem,)))
+    assert [d.message for d in result.diagnostics] == ["unsupported hard constraint shape"]
+
+
+def test_dimod_codegen_numeric_names_use_float_param_table() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="NumericParams",
+        set_values={},
+        params={"C": 4, "Flag": True, "Label": "x", "W": {"a": 1.0}},
+        finds=(),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+    diagnostics: list = []
+
+    def _value(name: str) -> object:
+        return codegen._num_expr(
+            problem,
+            ir.KName(span=span, name=name),
+            {},
+            diagnostics,
+            {},
+            dimod.ConstrainedQuadraticModel(),
+        )
+
+    assert _value("C") == 4.0
+    assert _value("Flag") == 1.0
+    assert codegen._numeric_params(problem) == {"C": 4.0, "Flag": 1.0}
+    assert codegen._numeric_params(problem) is codegen._numeric_params(problem)
+    assert not diagnostics
+
+    assert _value("Label") is None
+    assert _value("W") is None
+    assert [d.message for d in diagnostics] == [
+        "unsupported numeric name `Label`",
+        "unsupported numeric name `W`",
+    ]
+
+
+def test_dimod_codegen_expands_nested_foralls_as_one_product() -> None:
+    span = _span()
+
+    def _nested(outer: str, inner: str) -> ir.KQuantifier:
+        return ir.KQuantifier(
+            span=span,
+            kind="forall",
+            var="a",
+            domain_set=outer,
+            expr=ir.KQuantifier(
+                span=span,
+                kind="forall",
+                var="b",
+                domain_set=inner,
+                expr=ir.KImplies(
+                    span=span,
+                    left=ir.KMethodCall(
+                        span=span,
+                        target=ir.KName(span=span, name="S"),
+                        name="has",
+                        args=(ir.KName(span=span, name="a"),),
+                    ),
+                    right=ir.KMethodCall(
+                        span=span,
+                        target=ir.KName(span=span, name="S"),
+                        name="has",
+                        args=(ir.KName(span=span, name="b"),),
+                    ),
+                ),
+            ),
+        )
+
+    def _compile(expr: ir.KQuantifier, set_values: dict[str, list[object]]) -> CodegenResult:
+        problem = ir.GroundProblem(
+            span=span,
+            name="Nested",
+            set_values=set_values,
+            params={},
+            finds=(_subset_find("S", "A"),),
+            constraints=(ir.KConstraint(span=span, kind=ast.ConstraintKind.MUST, expr=expr),),
+            objectives=(),
+        )
+        return DimodCodegen().compile(ir.GroundIR(span=span, problems=(problem,)))
+
+    result = _compile(_nested("A", "A"), {"A": ["a2", "a1"]})
+    assert not result.diagnostics
+    assert len(result.cqm.constraints) == 4
+
+    assert not _compile(_nested("E", "Missing"), {"A": ["a1"], "E": []}).diagnostics
+    missing = _compile(_nested("A", "Missing"), {"A": ["a1", "a2"]})
+    assert [d.message for d in missing.diagnostics] == ["unknown set `Missing` in quantifier"]
+
+
+def test_dimod_codegen_integral_check_covers_offset_and_biases() -> None:
+    codegen = DimodCodegen()
+    x = dimod.Binary("x")
+    y = dimod.Binary("y")
+
+    assert codegen._is_integral_value(2 * x + 3 * x * y + 1)
+    assert not codegen._is_integral_value(2 * x + 0.5)
+    assert not codegen._is_integral_value(0.5 * x + 1)
+    assert not codegen._is_integral_value(x + 0.25 * x * y)
+    assert codegen._is_integral_value(4.0)
+    assert not codegen._is_integral_value("x")
+
+
+def test_dimod_codegen_static_set_lookup_reuses_member_strings() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="StaticHas",
+        set_values={"A": [1, 2]},
+        params={},
+        finds=(),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+    diagnostics: list = []
+
+    def _has(arg: ir.KExpr) -> object:
+        expr = ir.KMethodCall(
+            span=span, target=ir.KName(span=span, name="A"), name="has", args=(arg,)
+        )
+        return codegen._bool_atom(problem, expr, {}, diagnostics, {})
+
+    assert _has(ir.KNumLit(span=span, value=2)) == 1.0
+    assert _has(ir.KNumLit(span=span, value=3)) == 0.0
+    assert codegen._set_member_strings(problem, "A") is codegen._set_member_strings(problem, "A")
+    assert not diagnostics
+
+
+def test_dimod_codegen_quadratic_bounds_split_biases_by_sign() -> None:
+    codegen = DimodCodegen()
+    x = dimod.Binary("x")
+    y = dimod.Binary("y")
+
+    assert codegen._quadratic_bounds(2 * x - 3 * y + 4 * x * y - 1) == (-4.0, 5.0)
+    assert codegen._quadratic_bounds(1.5) is None
+
+
+def test_dimod_codegen_bool_names_use_truth_param_table() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="BoolParams",
+        set_values={},
+        params={"On": True, "Off": 0, "Half": 0.5, "Label": "x", "W": {"a": 1.0}},
+        finds=(),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+
+    def _truth(name: str) -> object:
+        return codegen._bool_atom(problem, ir.KName(span=span, name=name), {}, [], {})
+
+    assert _truth("On") == 1.0
+    assert _truth("Off") == 0.0
+    assert _truth("Half") is None
+    assert _truth("Label") is None
+    assert _truth("W") is None
+    assert _truth("Missing") is None
+    assert codegen._bool_params(problem) == {"On": 1.0, "Off": 0.0}
+
+
+def test_dimod_codegen_reuses_indicators_for_equal_differences() -> None:
+    span = _span()
+    codegen = DimodCodegen()
+    cqm = dimod.ConstrainedQuadraticModel()
+    x = dimod.Binary("x")
+    y = dimod.Binary("y")
+    diagnostics: list = []
+
+    def _leq(model: dimod.ConstrainedQuadraticModel, diff: object) -> object:
+        return codegen._indicator_leq(
+            model, diff, threshold=0.0, span=span, diagnostics=diagnostics
+        )
+
+    first = _leq(cqm, x + y - 1)
+    constraint_count = len(cqm.constraints)
+    assert _leq(cqm, y + x - 1) is first
+    assert len(cqm.constraints) == constraint_count
+    assert _leq(cqm, x + 2 * y - 1) is not first
+    assert (
+        codegen._indicator_geq(cqm, x + y - 1, threshold=0.0, span=span, diagnostics=diagnostics)
+        is not first
+    )
+
+    other = dimod.ConstrainedQuadraticModel()
+    assert _leq(other, x + y - 1) is not first
+    assert other.constraints
+    assert not diagnostics
+
+
+def test_dimod_codegen_compiles_scalar_sum_terms_once() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="ScalarTerms",
+        set_values={},
+        params={"c": 3},
+        finds=(),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+    term = ir.KSub(
+        span=span,
+        left=ir.KMul(
+            span=span, left=ir.KName(span=span, name="c"), right=ir.KName(span=span, name="i")
+        ),
+        right=ir.KNumLit(span=span, value=1.0),
+    )
+    compiled = codegen._scalar_term(problem, term)
+    assert codegen._scalar_term(problem, term) is compiled
+
+    diagnostics: list = []
+    assert compiled({"i": 2}, diagnostics) == 5.0
+    assert compiled({"i": "x"}, diagnostics) is None
+    assert compiled({}, diagnostics) is None
+    assert [d.message for d in diagnostics] == [
+        "non-numeric binder `i` in numeric context",
+        "unsupported numeric name `i`",
+    ]
+
+
+def test_dimod_codegen_folds_literal_scalar_subtrees() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="Folding",
+        set_values={},
+        params={},
+        finds=(),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+    one = ir.KNumLit(span=span, value=1.0)
+    folded = ir.KMul(span=span, left=ir.KAdd(span=span, left=one, right=one), right=one)
+    diagnostics: list = []
+    assert codegen._scalar_term(problem, folded)({}, diagnostics) == 2.0
+
+    zero = ir.KNumLit(span=span, value=0.0)
+    division = codegen._scalar_term(problem, ir.KDiv(span=span, left=one, right=zero))
+    # Not folded: every evaluation reports into the list it is given.
+    first: list = []
+    second: list = []
+    assert division({}, first) is None
+    assert division({}, second) is None
+    assert [d.message for d in first + second] == ["division by zero", "division by zero"]
+
+
+def test_dimod_codegen_scalar_terms_read_indexed_params_directly() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="IndexedTerms",
+        set_values={},
+        params={"w": {"a": 2, "b": True}, "W": {"a": {"x": 1.5}}, "k": "a"},
+        finds=(),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+
+    def _term(name: str, *args: str) -> object:
+        call = ir.KFuncCall(
+            span=span, name=name, args=tuple(ir.KName(span=span, name=arg) for arg in args)
+        )
+        return codegen._scalar_term(problem, call)
+
+    diagnostics: list = []
+    single = _term("w", "i")
+    assert single({"i": "a"}, diagnostics) == 2.0
+    assert single({"i": "b"}, diagnostics) == 1.0
+    assert _term("w", "k")({}, diagnostics) == 2.0
+    assert _term("W", "i", "j")({"i": "a", "j": "x"}, diagnostics) == 1.5
+    assert not diagnostics
+
+    assert single({"i": "c"}, diagnostics) is None
+    assert [d.message for d in diagnostics] == [
+        "unknown index `c` for param `w`",
+        "unsupported numeric function call",
+    ]
+    sub_table: list = []
+    assert _term("W", "i")({"i": "a"}, sub_table) is None
+    assert [d.message for d in sub_table] == ["unsupported numeric function call"]
+
+
+def test_indexed_param_shape_check_and_default_expansion() -> None:
+    sets: dict[str, list[object]] = {"I": ["b", "a"], "J": [1, 2], "D": ["x", "x"], "E": []}
+    relations = {"R": (("a", 1),)}
+
+    expanded = _expand_indexed_default(0, ["I", "J"], sets, relations)
+    assert expanded == {"a": {"1": 0, "2": 0}, "b": {"1": 0, "2": 0}}
+    assert expanded["a"] is not expanded["b"]
+    assert _expand_indexed_default(3, ["R"], sets, relations) == {"a,1": 3}
+    assert _check_shape(expanded, ["I", "J"], sets, relations)
+
+    assert not _check_shape({"a": {"1": 0}, "b": {"1": 0, "2": 0}}, ["I", "J"], sets, relations)
+    assert not _check_shape({"a": 1, "b": {"1": 0}}, ["I"], sets, relations)
+    assert not _check_shape({"a": {"1": 0, "2": 0}}, ["I", "J"], sets, relations)
+    assert not _check_shape({"x": 1}, ["D"], sets, relations)
+    assert _check_shape({"anything": 1}, ["E"], sets, relations)
+    assert _check_shape({"a,1": 2.0}, ["R"], sets, relations)
+
+
+def test_dimod_codegen_if_then_else_keeps_dead_branch_variables() -> None:
+    span = _span()
+    x = ir.KName(span=span, name="x")
+    has = ir.KMethodCall(span=span, target=ir.KName(span=span, name="S"), name="has", args=(x,))
+    # minimize sum(if W[x] > 0 then S.has(x) else 0 for x in A), with W[a2] = 0
+    term = ir.KIfThenElse(
+        span=span,
+        cond=ir.KCompare(
+            span=span,
+            op=">",
+            left=ir.KFuncCall(span=span, name="W", args=(x,)),
+            right=ir.KNumLit(span=span, value=0),
+        ),
+        then_expr=ir.KIfThenElse(
+            span=span,
+            cond=has,
+            then_expr=ir.KNumLit(span=span, value=1),
+            else_expr=ir.KNumLit(span=span, value=0),
+        ),
+        else_expr=ir.KNumLit(span=span, value=0),
+    )
+    problem = ir.GroundProblem(
+        span=span,
+        name="DeadBranch",
+        set_values={"A": ["a1", "a2"]},
+        params={"W": {"a1": 2.0, "a2": 0.0}},
+        finds=(_subset_find("S", "A"),),
+        constraints=(),
+        objectives=(
+            ir.KObjective(
+                span=span,
+                kind=ast.ObjectiveKind.MINIMIZE,
+                expr=ir.KSum(
+                    span=span,
+                    comp=ir.KNumComprehension(span=span, term=term, var="x", domain_set="A"),
+                ),
+            ),
+        ),
+    )
+
+    result = DimodCodegen().compile(ir.GroundIR(span=span, problems=(problem,)))
+    assert not result.diagnostics
+    labels = {"S.has[a1]", "S.has[a2]"}
+    assert set(result.varmap) == labels
+    assert set(result.cqm.variables) == labels
+    assert set(result.bqm.variables) == labels
+    assert result.cqm.objective.get_linear("S.has[a2]") == 0.0
+
+
+def test_dimod_codegen_scalar_name_term_prefers_binder_over_param() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="NameTerms",
+        set_values={},
+        params={"c": 2.0, "t": {"a": 1}},
+        finds=(),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+    diagnostics: list = []
+    term = codegen._scalar_term(problem, ir.KName(span=span, name="c"))
+    assert term({}, diagnostics) == 2.0
+    assert term({"c": "3"}, diagnostics) == 3.0
+    assert not diagnostics
+    assert codegen._scalar_term(problem, ir.KName(span=span, name="t"))({}, diagnostics) is None
+    assert [d.message for d in diagnostics] == ["unsupported numeric name `t`"]
+
+
+def test_dimod_codegen_parses_numeric_binder_values_once() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="BinderFloats",
+        set_values={},
+        params={},
+        finds=(),
+        constraints=(),
+        objectives=(),
+    )
+    codegen = DimodCodegen()
+    cqm = dimod.ConstrainedQuadraticModel()
+    diagnostics: list = []
+    name = ir.KName(span=span, name="i")
+    term = codegen._scalar_term(problem, name)
+
+    assert term({"i": "2.5"}, diagnostics) == 2.5
+    assert codegen._binder_floats == {"2.5": 2.5}
+    assert codegen._num_expr(problem, name, {}, diagnostics, {"i": "2.5"}, cqm=cqm) == 2.5
+    assert codegen._num_expr(problem, name, {}, diagnostics, {"i": 3}, cqm=cqm) == 3.0
+    assert not diagnostics
+
+    closure_diagnostics: list = []
+    assert term({"i": "a"}, closure_diagnostics) is None
+    assert codegen._num_expr(problem, name, {}, diagnostics, {"i": "a"}, cqm=cqm) is None
+    message = "non-numeric binder `i` in numeric context"
+    assert [d.message for d in closure_diagnostics + diagnostics] == [message, message]
+    assert "a" not in codegen._binder_floats
+
+
+def test_dimod_codegen_lowers_soft_constraints_after_objective() -> None:
+    span = _span()
+    problem = ir.GroundProblem(
+        span=span,
+        name="SoftOrder",
+        set_values={},
+        params={},
+        finds=(),
+        constraints=(
+            ir.KConstraint(
+                span=span,
+                kind=ast.ConstraintKind.SHOULD,
+                expr=ir.KName(span=span, name="missing_flag"),
+            ),
+        ),
+        objectives=(
+            ir.KObjective(
+                span=span,
+                kind=ast.ObjectiveKind.MINIMIZE,
+                expr=ir.KName(span=span, name="missing_cost"),
+            ),
+        ),
+    )
+    result = DimodCodegen().compile(ir.GroundIR(span=span, problems=(problem,)))
+    messages = [d.message for d in result.diagnostics]
+    assert messages.index("unsupported objective expression") < messages.index(
+        "unsupported soft constraint"
+    )
+
+
+def test_dimod_codegen_report_skips_building_repeated_diagnostics(monkeypatch) -> None:
+    span = _span()
+    codegen = DimodCodegen()
+    built: list[str] = []
+    unsupported = codegen._unsupported
+
+    def _counting(span_arg: Span, message: str) -> object:
+        built.append(message)
+        return unsupported(span_arg, message)
+
+    monkeypatch.setattr(codegen, "_unsupported", _counting)
+    diagnostics: list = []
+    for _ in range(3):
+        codegen._report(diagnostics, span, "unsupported hard constraint shape")
+    codegen._report(diagnostics, span, "unsupported multiplication shape")
+    other: list = []
+    codegen._report(other, span, "unsupported hard constraint shape")
+
+    assert type(diagnostics) is list
+    assert [d.message for d in diagnostics] == [
+        "unsupported hard constraint shape",
+        "unsupported multiplication shape",
+    ]
+    assert [d.code for d in diagnostics] == ["QSOL3001", "QSOL3002"]
+    assert len(other) == 1
+    assert built == [
+        "unsupported hard constraint shape",
+        "unsupported multiplication shape",
+        "unsupported hard constraint shape",
+    ]
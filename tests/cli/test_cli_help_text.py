@@ -109,6 +109,7 @@ def test_argparse_cli_help_texts_are_useful() -> None:
     assert "Run all example equivalence scripts and report a rich summary." in suite_help.stdout
     assert "Sampler mode to pass to each equivalence script" in suite_help.stdout
     assert "Per-script timeout in seconds; 0 disables timeout" in suite_help.stdout
+    assert "Number of scripts to run concurrently" in suite_help.stdout
 
     example_scripts = [
         repo_root / "examples" / "generic_bqm" / "test_equivalence.py",
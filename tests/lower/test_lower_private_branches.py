@@ -139,3 +139,23 @@ def test_private_lower_helpers_cover_remaining_expression_branches() -> None:
 
     with pytest.raises(TypeError):
         _lower_num(cast(ast.NumExpr, ast.StringLit(span=span, value="bad")))
+
+
+def test_lowering_interns_binder_and_reference_names() -> None:
+    span = _span()
+    var = "".join(["it", "em"])
+    ref = "".join(["it", "em"])
+    assert var is not ref
+
+    lowered = _lower_bool(
+        ast.Quantifier(
+            span=span,
+            kind="forall",
+            var=var,
+            domain_set="Items",
+            expr=ast.NameRef(span=span, name=ref),
+        )
+    )
+    assert isinstance(lowered, ir.KQuantifier)
+    assert isinstance(lowered.expr, ir.KName)
+    assert lowered.var is lowered.expr.name
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import pytest
+
+SUITE_PATH = Path(__file__).resolve().parents[1] / "examples" / "run_equivalence_suite.py"
+
+
+def _load_suite(monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    spec = importlib.util.spec_from_file_location("run_equivalence_suite", SUITE_PATH)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses resolve the defining module through sys.modules.
+    monkeypatch.setitem(sys.modules, spec.name, module)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_interrupted_suite_kills_running_scripts(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    suite = _load_suite(monkeypatch)
+    pid_file = tmp_path / "child.pid"
+    script = tmp_path / "hang" / "test_equivalence.py"
+    script.parent.mkdir()
+    script.write_text(
+        "import os, pathlib, time\n"
+        f"pathlib.Path({str(pid_file)!r}).write_text(str(os.getpid()))\n"
+        "time.sleep(120)\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(suite, "_discover_equivalence_scripts", lambda _dir: [script, script])
+    monkeypatch.setattr(
+        sys, "argv", ["run_equivalence_suite.py", "--timeout-seconds", "0", "--jobs", "1"]
+    )
+
+    main_thread = threading.get_ident()
+
+    def _interrupt_once_started() -> None:
+        deadline = time.monotonic() + 30
+        while not pid_file.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        # A real signal, so the main thread's blocking wait is interrupted too.
+        signal.pthread_kill(main_thread, signal.SIGINT)
+
+    threading.Thread(target=_interrupt_once_started, daemon=True).start()
+    start = time.monotonic()
+    with pytest.raises(KeyboardInterrupt):
+        suite.main()
+
+    assert time.monotonic() - start < 30
+    pid = int(pid_file.read_text(encoding="utf-8"))
+    assert not _pid_alive(pid)
+
+
+def test_parse_summary_accepts_non_finite_offsets(monkeypatch: pytest.MonkeyPatch) -> None:
+    suite = _load_suite(monkeypatch)
+    payload = json.dumps({"offset_expected": float("nan"), "offset_delta": float("inf")})
+    summary = suite._parse_summary(payload)
+    assert summary is not None
+    assert summary["offset_delta"] == float("inf")
+    assert suite._parse_summary("not json") is None
+
+
+def _write_script(tmp_path: Path, name: str, body: str) -> Path:
+    script = tmp_path / name / "test_equivalence.py"
+    script.parent.mkdir()
+    script.write_text(body, encoding="utf-8")
+    return script
+
+
+def _run(suite: ModuleType, script: Path, timeout_seconds: int) -> Any:
+    return suite._run_script(
+        script,
+        repo_root=script.parent,
+        sampler="exact",
+        num_reads=1,
+        timeout_seconds=timeout_seconds,
+        run_env=dict(os.environ),
+        live=suite._LiveProcesses(),
+    )
+
+
+def test_late_timer_does_not_flag_a_finished_script(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    suite = _load_suite(monkeypatch)
+    timers: list[Any] = []
+
+    class _HeldTimer:
+        # Never fires on its own; the test fires it after the script has finished.
+        def __init__(self, _interval: float, function: Callable[[], None]) -> None:
+            self.function = function
+            timers.append(self)
+
+        def start(self) -> None:
+            pass
+
+        def cancel(self) -> None:
+            pass
+
+    monkeypatch.setattr(suite.threading, "Timer", _HeldTimer)
+    script = _write_script(tmp_path, "quick", "print('done')\n")
+
+    result = _run(suite, script, timeout_seconds=5)
+    (timer,) = timers
+    timer.function()
+
+    assert result.returncode == 0
+    assert not result.timed_out
+
+
+def test_script_that_closes_its_output_still_times_out(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    suite = _load_suite(monkeypatch)
+    script = _write_script(
+        tmp_path, "silent", "import os, time\nos.close(1)\nos.close(2)\ntime.sleep(60)\n"
+    )
+
+    start = time.monotonic()
+    result = _run(suite, script, timeout_seconds=1)
+
+    assert time.monotonic() - start < 30
+    assert result.timed_out
+    assert result.returncode == 124
+
+
+def test_jobs_must_be_at_least_one(monkeypatch: pytest.MonkeyPatch) -> None:
+    suite = _load_suite(monkeypatch)
+    assert suite._job_count("2") == 2
+    for value in ("0", "-1", "x"):
+        with pytest.raises(suite.argparse.ArgumentTypeError):
+            suite._job_count(value)
@@ -8,6 +8,7 @@ from types import SimpleNamespace
 
 import dimod
 import pytest
+from rich.console import Console
 
 from qsol.diag.diagnostic import Diagnostic, Severity
 from qsol.diag.source import Span
@@ -144,6 +145,12 @@ def test_sample_best_assignment_covers_exact_sa_and_guard() -> None:
         )
 
 
+def test_chosen_subset_elements_filters_prefix_and_value() -> None:
+    sample = {"X.has[b]": 1, "X.has[a]": 1, "X.has[c]": 0, "Y.has[d]": 1, "aux": 1}
+    assert exeq.chosen_subset_elements(sample, "X.has[") == ["a", "b"]
+    assert exeq.chosen_subset_elements(sample, "Z.has[") == []
+
+
 def test_parse_args_positive_int_and_load_instance_payload(
     monkeypatch: pytest.MonkeyPatch, tmp_path: Path
 ) -> None:
@@ -548,3 +555,18 @@ def test_build_equivalence_report_expected_none_and_singleton_edge() -> None:
     assert report.equivalent is False
     assert report.expected_num_variables == 0
     assert bqme._edge_labels(frozenset({"solo"})) == ("solo", "solo")
+
+
+def test_check_equivalence_reuses_precompiled_bqm(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail_compile(**kwargs: object) -> None:
+        raise AssertionError("program must not be recompiled")
+
+    monkeypatch.setattr(bqme, "_compile_program_to_bqm", fail_compile)
+    bqm = _single_var_bqm()
+    report = bqme.check_qsol_program_bqm_equivalence(
+        "p",
+        bqm,
+        console=Console(file=io.StringIO()),
+        compiled=(bqm.copy(), []),
+    )
+    assert report.equivalent